@@ -0,0 +1,4 @@
+from __future__ import annotations
+from .cli import main
+
+raise SystemExit(main())
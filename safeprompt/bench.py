@@ -0,0 +1,210 @@
+from __future__ import annotations
+import json
+import platform
+import random
+import re
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import __version__
+from .cert.checker import BaselineAnalysis, check_patch
+from .operators.registry import registry
+from .pipeline import repair_source
+from .rcg.build_rcg import EXTERNAL_CALL_RE, build_rcg
+from .rcg.index import ContractIndex
+from .utils import Witness
+
+@dataclass(frozen=True)
+class SynthParams:
+    functions: int = 20
+    body_lines: int = 12
+    nesting: int = 1
+    external_calls: int = 1
+    seed: int = 0
+
+def generate_contract(params: SynthParams) -> Tuple[str, List[str]]:
+    """Deterministic synthetic Solidity contract and the names of its functions.
+
+    Every function reads like the reentrancy example: guards, local arithmetic and
+    state updates, with `external_calls` low-level calls placed before the final
+    balance update, wrapped in `nesting` levels of if-blocks.
+    """
+    rng = random.Random(params.seed)
+    out = [
+        "// SPDX-License-Identifier: MIT",
+        "pragma solidity ^0.8.20;",
+        "",
+        "contract Synthetic {",
+        "    mapping(address => uint256) public balances;",
+        "    uint256 public total;",
+        "",
+    ]
+    names = []
+    for f in range(params.functions):
+        name = f"op{f}"
+        names.append(name)
+        out.append(f"    function {name}(uint256 amount) external {{")
+        out.append("        require(balances[msg.sender] >= amount, \"insufficient\");")
+        indent = "        "
+        for d in range(params.nesting):
+            out.append(f"{indent}if (amount > {d}) {{")
+            indent += "    "
+        filler = max(0, params.body_lines - params.external_calls - 2)
+        for k in range(filler):
+            r = rng.random()
+            if r < 0.4:
+                out.append(f"{indent}uint256 t{k} = amount + {rng.randint(1, 99)};")
+            elif r < 0.7:
+                out.append(f"{indent}total += {rng.randint(1, 9)};")
+            elif r < 0.85:
+                out.append(f"{indent}// step {k}: bookkeeping")
+            else:
+                out.append(f"{indent}require(total != {rng.randint(100, 999)}, \"state\");")
+        for c in range(params.external_calls):
+            out.append(f"{indent}(bool ok{c},) = msg.sender.call{{value: amount}}(\"\");")
+            out.append(f"{indent}require(ok{c}, \"call failed\");")
+        out.append(f"{indent}balances[msg.sender] -= amount;")
+        for d in range(params.nesting):
+            indent = indent[:-4]
+            out.append(f"{indent}}}")
+        out.append("    }")
+        out.append("")
+    out.append("}")
+    return "\n".join(out) + "\n", names
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    k = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return sorted_samples[k]
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    total = sum(s)
+    return {
+        "n": len(s),
+        "mean_ms": 1000 * total / len(s) if s else 0.0,
+        "p50_ms": 1000 * _percentile(s, 0.50),
+        "p90_ms": 1000 * _percentile(s, 0.90),
+        "p99_ms": 1000 * _percentile(s, 0.99),
+        "throughput_per_s": len(s) / total if total else 0.0,
+    }
+
+def _time(fn: Callable[[], Any], samples: List[float]) -> Any:
+    t0 = time.perf_counter()
+    result = fn()
+    samples.append(time.perf_counter() - t0)
+    return result
+
+def bench_config(params: SynthParams, repeats: int = 3, max_functions: int = 20) -> Dict[str, Any]:
+    """Latency percentiles per stage, throughput and peak memory for one synthetic input."""
+    src, names = generate_contract(params)
+    targets = names[:max_functions]
+    ops = registry().families()["reentrancy"]
+    stages: Dict[str, List[float]] = {"index": [], "build_rcg": [], "check_patch": [], "repair": []}
+    for op in ops:
+        stages[f"apply:{op.name}"] = []
+
+    for _ in range(repeats):
+        index = _time(lambda: ContractIndex.build(src), stages["index"])
+        baseline = BaselineAnalysis(src, index)
+        for fn in targets:
+            rcg = _time(lambda: build_rcg(src, fn, index), stages["build_rcg"])
+            for op in ops:
+                patched, _ = _time(lambda: op.apply(src, fn), stages[f"apply:{op.name}"])
+                _time(lambda: check_patch(src, patched, "reentrancy", op.name, fn, rcg.predicates,
+                                          lazy=True, baseline=baseline)[1].diff_unified, stages["check_patch"])
+        for fn in targets:
+            _time(lambda: repair_source(src, Witness(vuln_class="reentrancy", function=fn), "Synthetic.sol"),
+                  stages["repair"])
+
+    tracemalloc.start()
+    repair_source(src, Witness(vuln_class="reentrancy", function=targets[0]), "Synthetic.sol")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "params": asdict(params),
+        "source_bytes": len(src.encode("utf-8")),
+        "source_lines": src.count("\n"),
+        "stages": {name: _summarize(samples) for name, samples in stages.items()},
+        "peak_repair_memory_bytes": peak,
+        "rcg_mismatches": rcg_mismatches(src, names),
+    }
+
+def _reference_rcg(src: str, fn: str, index: ContractIndex) -> Tuple[List[Tuple[str, int, str]], Dict[str, bool]]:
+    # the original line-by-line heuristics of build_rcg, kept as the oracle for its single-scan classifier
+    span = index.function(fn)
+    nodes = []
+    pred = {"has_external_call": False, "has_state_write": False, "has_require_guard": False}
+    for ln in range(span.start_line, span.end_line + 1):
+        stripped = index.line_text(ln).strip()
+        if "require(" in stripped or "assert(" in stripped:
+            pred["has_require_guard"] = True
+        if EXTERNAL_CALL_RE.search(stripped):
+            pred["has_external_call"] = True
+            nodes.append(("external_call", ln, stripped))
+            continue
+        if re.search(r'\b\w+\s*(\[.*?\])?\s*\+=|\b\w+\s*(\[.*?\])?\s*-=', stripped) or re.search(r'=\s*[^=]', stripped):
+            if "memory" not in stripped and "calldata" not in stripped and not stripped.startswith("//") and "==" not in stripped:
+                pred["has_state_write"] = True
+                nodes.append(("state_write", ln, stripped))
+    return nodes, pred
+
+def rcg_mismatches(src: str, names: List[str]) -> List[str]:
+    """Functions whose RCG nodes or predicates differ from the reference line-by-line heuristics."""
+    index = ContractIndex.build(src)
+    out = []
+    for fn in names:
+        rcg = build_rcg(src, fn, index, interprocedural=False)
+        nodes, pred = _reference_rcg(src, fn, index)
+        got = [(n.kind, n.line, n.text) for n in rcg.nodes]
+        edges = [(i, i + 1) for i in range(len(got) - 1)]
+        if got != nodes or rcg.predicates != pred or rcg.edges != edges:
+            out.append(fn)
+    return out
+
+def default_grid(quick: bool = False) -> List[SynthParams]:
+    """A base input plus one sweep per knob, so each stage's scaling can be read off directly."""
+    base = SynthParams()
+    sweeps = {
+        "functions": [5, 20, 80] if quick else [10, 50, 200, 800],
+        "body_lines": [6, 24] if quick else [6, 24, 96],
+        "nesting": [0, 3] if quick else [0, 2, 6],
+        "external_calls": [1, 4] if quick else [1, 4, 16],
+    }
+    grid = [base]
+    for knob, values in sweeps.items():
+        for v in values:
+            p = replace(base, **{knob: v})
+            if p not in grid:
+                grid.append(p)
+    return grid
+
+def run_suite(grid: List[SynthParams], repeats: int = 3, max_functions: int = 20) -> Dict[str, Any]:
+    return {
+        "safeprompt_version": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [bench_config(p, repeats, max_functions) for p in grid],
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.25) -> List[str]:
+    """Stages whose p50 latency grew by more than `threshold` against the baseline."""
+    def key(r):
+        return json.dumps(r["params"], sort_keys=True)
+
+    old = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current.get("results", []):
+        prev = old.get(key(r))
+        if prev is None:
+            continue
+        for stage, stats in r["stages"].items():
+            before = prev["stages"].get(stage, {}).get("p50_ms")
+            if before and stats["p50_ms"] > before * threshold:
+                regressions.append(f"{stage} {r['params']}: p50 {before:.3f}ms -> {stats['p50_ms']:.3f}ms "
+                                   f"(x{stats['p50_ms'] / before:.2f})")
+    return regressions
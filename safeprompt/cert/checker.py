@@ -2,67 +2,290 @@
 from __future__ import annotations
 import difflib
 import re
-from dataclasses import dataclass
-from typing import Dict, Any, Tuple
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from ..rcg.index import ContractIndex
+from .compiler import CompileBackend
+
+_HUNK_RE = re.compile(r'^@@ -(\d+)((?:,\d+)?) \+(\d+)((?:,\d+)?) @@')
 
 @dataclass
 class Certificate:
     vuln_class: str
     operator: str
     function: str
+    diff_unified: Optional[str]  # None when the diff was not materialized (rejected candidates)
+    predicates: Dict[str, bool]
+    postconditions: Dict[str, bool]
+    notes: str
+
+@dataclass
+class CompositeCertificate:
+    """One certificate for several targets patched into the same contract.
+
+    Each entry of `targets` was re-checked against the composed contract; the
+    combined change is described by the single `diff_unified`.
+    """
     diff_unified: str
+    targets: List[Certificate]
+    notes: str
+
+@dataclass
+class PendingCertificate:
+    """Certificate payload whose unified diff is only computed on demand."""
+    vuln_class: str
+    operator: str
+    function: str
     predicates: Dict[str, bool]
     postconditions: Dict[str, bool]
     notes: str
+    before_src: str = field(repr=False)
+    after_src: str = field(repr=False)
+    _diff: Optional[str] = field(default=None, repr=False)
+    body_checks: Dict[str, bool] = field(default_factory=dict, repr=False)
+    # results of the checks that only read the target function's body (reusable for identical bodies)
+
+    @property
+    def diff_unified(self) -> str:
+        if self._diff is None:
+            self._diff = scoped_unified_diff(self.before_src, self.after_src)
+        return self._diff
+
+    def materialize(self, include_diff: bool = True) -> Certificate:
+        return Certificate(
+            vuln_class=self.vuln_class,
+            operator=self.operator,
+            function=self.function,
+            diff_unified=self.diff_unified if include_diff else None,
+            predicates=self.predicates,
+            postconditions=self.postconditions,
+            notes=self.notes,
+        )
+
+def _common_prefix_len(a: str, b: str, chunk: int = 4096) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i:i + chunk] == b[i:i + chunk]:
+        i += chunk
+    i = min(i, n)
+    end = min(i + chunk, n)
+    while i < end and a[i] == b[i]:
+        i += 1
+    return i
+
+def _common_suffix_len(a: str, b: str, limit: int, chunk: int = 4096) -> int:
+    la, lb = len(a), len(b)
+    i = 0
+    while i < limit and a[la - min(i + chunk, limit):la - i] == b[lb - min(i + chunk, limit):lb - i]:
+        i = min(i + chunk, limit)
+    while i < limit and a[la - i - 1] == b[lb - i - 1]:
+        i += 1
+    return i
+
+def changed_region(before: str, after: str) -> Tuple[int, int]:
+    """Line-aligned span [start, end) of `before` that differs from `after`.
+
+    Everything before `start` and from `end` on is byte-identical in both files;
+    the matching span of `after` is [start, end + len(after) - len(before)).
+    """
+    p = _common_prefix_len(before, after)
+    s = _common_suffix_len(before, after, min(len(before), len(after)) - p)
+    start = before.rfind("\n", 0, p) + 1
+    end = before.find("\n", len(before) - s)
+    return start, len(before) if end == -1 else end + 1
+
+def _widen(text: str, start: int, end: int, lines: int) -> Tuple[int, int]:
+    # extend the line-aligned span [start, end) of `text` by `lines` whole lines on each side
+    for _ in range(lines):
+        if start == 0:
+            break
+        start = text.rfind("\n", 0, start - 1) + 1
+    for _ in range(lines):
+        if end >= len(text):
+            break
+        nxt = text.find("\n", end)
+        end = len(text) if nxt == -1 else nxt + 1
+    return start, end
+
+def _hunk_range(start: str, count: str) -> Tuple[int, int]:
+    # 1-based first line and line count of one side of a hunk header ("-l,c" / "-l")
+    return int(start), int(count[1:]) if count else 1
+
+def scoped_unified_diff(before: str, after: str, context: int = 3,
+                        fromfile: str = "before.sol", tofile: str = "after.sol") -> str:
+    """Unified diff computed only over the region that actually changed.
+
+    Operators edit a single function (plus, at most, a declaration near the contract
+    header), so the common prefix and suffix of the two files are trimmed to line
+    boundaries and difflib only sees the edited span plus some padding around it.
+    Hunk headers are shifted back to whole-file line numbers. difflib may align
+    repeated lines ("}", blank lines) differently inside the slice, so a hunk that
+    reaches either edge of the slice (and could lack its context there) makes the
+    slice wider; past `max_pad` lines the whole files are diffed.
+    """
+    if before == after:
+        return ""
+    region = changed_region(before, after)
+    delta = len(after) - len(before)
+    pad, max_pad = max(4 * context, 16), 1024
+    while pad <= max_pad:
+        start, end = _widen(before, *region, pad)
+        if start == 0 and end == len(before):
+            break
+        a = before[start:end].splitlines(True)
+        b = after[start:end + delta].splitlines(True)
+        lines = list(difflib.unified_diff(a, b, fromfile=fromfile, tofile=tofile, n=context))
+        offset = before.count("\n", 0, start)
+        out, at_edge = [], False
+        for line in lines:
+            m = _HUNK_RE.match(line) if line.startswith("@@") else None
+            if m:
+                for (first, count), size in ((_hunk_range(m.group(1), m.group(2)), len(a)),
+                                             (_hunk_range(m.group(3), m.group(4)), len(b))):
+                    at_edge |= (start > 0 and first <= 1) or (end < len(before) and first + count - 1 >= size)
+                line = f"@@ -{int(m.group(1)) + offset}{m.group(2)} +{int(m.group(3)) + offset}{m.group(4)} @@\n"
+            out.append(line)
+        if not at_edge:
+            return "".join(out)
+        pad *= 4
+    return "".join(difflib.unified_diff(before.splitlines(True), after.splitlines(True),
+                                        fromfile=fromfile, tofile=tofile, n=context))
+
+_SIG_RE = re.compile(r'\bfunction\s+(\w+)\s*\(([^)]*)\)\s*(public|external)')
+_ASSIGN_RE = re.compile(r'=\s*[^=]')
+_WS_RE = re.compile(r'\s+')
+MUTEX_MARKER = "__safeprompt_entered"
+
+def _abi_signatures(src: str, start: int = 0, end: Optional[int] = None) -> set:
+    return set((m.group(1), _WS_RE.sub('', m.group(2))) for m in _SIG_RE.finditer(src, start, len(src) if end is None else end))
 
 def _abi_compatibility_heuristic(before: str, after: str) -> bool:
     # Check that public/external function signatures are unchanged (rough heuristic).
-    sig_re = re.compile(r'\bfunction\s+(\w+)\s*\(([^)]*)\)\s*(public|external)')
-    before_sigs = set((m.group(1), re.sub(r'\s+', '', m.group(2))) for m in sig_re.finditer(before))
-    after_sigs = set((m.group(1), re.sub(r'\s+', '', m.group(2))) for m in sig_re.finditer(after))
-    return before_sigs == after_sigs
+    return _abi_signatures(before) == _abi_signatures(after)
+
+class BaselineAnalysis:
+    """Facts about the unpatched contract, computed once and shared by every candidate.
 
-def check_patch(before_src: str, after_src: str, vuln_class: str, operator: str, function: str, predicates: Dict[str, bool]) -> Tuple[bool, Certificate]:
+    Holds the ABI signature matches, the contract index (function spans) and the
+    per-function body patterns, so postconditions only need to look at the part of
+    the patched file that differs from the original.
+    """
+
+    def __init__(self, src: str, index: Optional[ContractIndex] = None):
+        self.source = src
+        self.index = index if index is not None else ContractIndex.build(src)
+        self.sig_matches = [(m.start(), m.end(), (m.group(1), _WS_RE.sub('', m.group(2)))) for m in _SIG_RE.finditer(src)]
+        self.abi_signatures = set(sig for _, _, sig in self.sig_matches)
+        self.mutex_markers = [m.start() for m in re.finditer(re.escape(MUTEX_MARKER), src)]
+        self._fn_starts = [fn.start for fn in self.index.functions]
+        self._fn_patterns: Dict[str, Tuple[re.Pattern, int]] = {}
+
+    def function_pattern(self, name: str) -> Tuple[re.Pattern, int]:
+        """Body pattern for `name` and the offset of its first occurrence in the original."""
+        if name not in self._fn_patterns:
+            fn_re = re.compile(rf'function\s+{re.escape(name)}\b[\s\S]*?\{{([\s\S]*?)\n\s*\}}', re.MULTILINE)
+            m = re.search(rf'function\s+{re.escape(name)}\b', self.source)
+            self._fn_patterns[name] = (fn_re, m.start() if m else len(self.source))
+        return self._fn_patterns[name]
+
+    def window(self, after: str) -> Tuple[int, int]:
+        """Changed region widened to whole enclosing functions (offsets in the original)."""
+        start, end = changed_region(self.source, after)
+        i = bisect_right(self._fn_starts, start) - 1
+        if i >= 0 and self.index.functions[i].end > start:
+            start = self.index.functions[i].start
+        j = bisect_right(self._fn_starts, max(end - 1, start)) - 1
+        if j >= 0 and self.index.functions[j].end > end:
+            end = self.index.functions[j].end
+        return start, end
+
+    def abi_compatible(self, after: str, window: Tuple[int, int]) -> bool:
+        start, end = window
+        if any(s < start < e or s < end < e for s, e, _ in self.sig_matches):
+            # a signature straddles the window edge; be exact rather than clever
+            return self.abi_signatures == _abi_signatures(after)
+        kept = set(sig for s, e, sig in self.sig_matches if e <= start or s >= end)
+        return self.abi_signatures == kept | _abi_signatures(after, start, end + len(after) - len(self.source))
+
+    def has_mutex(self, after: str, window: Tuple[int, int]) -> bool:
+        start, end = window
+        if any(p + len(MUTEX_MARKER) <= start or p >= end for p in self.mutex_markers):
+            return True
+        return after.find(MUTEX_MARKER, start, end + len(after) - len(self.source)) != -1
+
+def check_patch(before_src: str, after_src: str, vuln_class: str, operator: str, function: str, predicates: Dict[str, bool],
+                lazy: bool = False, baseline: Optional[BaselineAnalysis] = None,
+                body_checks: Optional[Dict[str, bool]] = None,
+                compiler: Optional[CompileBackend] = None) -> Tuple[bool, Union[Certificate, PendingCertificate]]:
     # Postconditions are class-specific. Here we implement a minimal, checkable set.
+    # With lazy=True the diff is deferred and a PendingCertificate is returned.
+    # A BaselineAnalysis of before_src lets postconditions look only at the changed span.
+    # `body_checks` from an earlier check of the same patched function body skip re-reading it.
+    # A `compiler` backend replaces the compile placeholder with a real (cached) compile check.
     post = {}
     notes = []
+    body = {}
 
-    post["compiles_placeholder"] = True  # compilation is outside this lightweight artifact
-    post["abi_compatible"] = _abi_compatibility_heuristic(before_src, after_src)
+    window = baseline.window(after_src) if baseline is not None else None
+
+    if compiler is None:
+        post["compiles_placeholder"] = True  # compilation is outside this lightweight artifact
+    else:
+        compiled = compiler.check(after_src)
+        post[compiler.postcondition] = compiled["ok"]
+        if not compiled["ok"]:
+            notes.append("Patched contract does not compile: " + " | ".join(e.strip().split("\n")[0] for e in compiled["errors"][:3]))
+    if baseline is not None:
+        post["abi_compatible"] = baseline.abi_compatible(after_src, window)
+    else:
+        post["abi_compatible"] = _abi_compatibility_heuristic(before_src, after_src)
     if not post["abi_compatible"]:
         notes.append("ABI compatibility heuristic failed (public/external signatures changed).")
 
     # Reentrancy postcondition: presence of either a mutex flag or a moved state write before external call (heuristic).
     if vuln_class == "reentrancy":
-        has_mutex = "__safeprompt_entered" in after_src
-        # heuristic for CEI: look for state write before .call in function text
-        fn_re = re.compile(rf'function\s+{re.escape(function)}\b[\s\S]*?\{{([\s\S]*?)\n\s*\}}', re.MULTILINE)
-        m = fn_re.search(after_src)
-        cei_ok = False
-        if m:
-            body = m.group(1)
-            idx_call = body.find(".call")
-            if idx_call != -1:
-                # find any assignment before call
-                assigns = [m2.start() for m2 in re.finditer(r'=\s*[^=]', body)]
-                cei_ok = any(a < idx_call for a in assigns)
+        if baseline is not None:
+            has_mutex = baseline.has_mutex(after_src, window)
+        else:
+            has_mutex = MUTEX_MARKER in after_src
+        if body_checks is not None and "cei_ok" in body_checks:
+            cei_ok = body_checks["cei_ok"]
+        else:
+            if baseline is not None:
+                fn_re, first = baseline.function_pattern(function)
+                # the original prefix is unchanged up to the window, so no earlier match can exist
+                m = fn_re.search(after_src, min(first, window[0]))
+            else:
+                fn_re = re.compile(rf'function\s+{re.escape(function)}\b[\s\S]*?\{{([\s\S]*?)\n\s*\}}', re.MULTILINE)
+                m = fn_re.search(after_src)
+            # heuristic for CEI: look for state write before .call in function text
+            cei_ok = False
+            if m:
+                fn_body = m.group(1)
+                idx_call = fn_body.find(".call")
+                if idx_call != -1:
+                    # find any assignment before call
+                    assigns = [m2.start() for m2 in _ASSIGN_RE.finditer(fn_body)]
+                    cei_ok = any(a < idx_call for a in assigns)
+        body["cei_ok"] = cei_ok
         post["reentrancy_guard_present"] = bool(has_mutex or cei_ok)
         if not post["reentrancy_guard_present"]:
             notes.append("Reentrancy postcondition heuristic failed (no guard or effect-before-interaction evidence found).")
 
     ok = all(post.values())
-    diff = "".join(difflib.unified_diff(
-        before_src.splitlines(True), after_src.splitlines(True),
-        fromfile="before.sol", tofile="after.sol"
-    ))
-
-    cert = Certificate(
+    cert = PendingCertificate(
         vuln_class=vuln_class,
         operator=operator,
         function=function,
-        diff_unified=diff,
         predicates=predicates,
         postconditions=post,
         notes="; ".join(notes) if notes else "ok",
+        before_src=before_src,
+        after_src=after_src,
+        body_checks=body,
     )
-    return ok, cert
+    if lazy:
+        return ok, cert
+    return ok, cert.materialize()
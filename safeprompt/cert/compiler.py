@@ -0,0 +1,202 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..rcg.cache import TieredStore
+
+# Compile postcondition backends. `check_patch` asks the backend whether the patched
+# contract compiles; results are cached by hash(compiler identity, settings, source),
+# so candidates that produce the same patched source are compiled once.
+
+class CompileBackend:
+    """Interface of a compile-check backend.
+
+    `postcondition` names the postcondition it fills in, `submit` starts a check in
+    the background and `check` waits for one. Results are {"ok": bool, "errors": [...]}.
+    """
+    postcondition = "compiles"
+
+    def submit(self, source: str) -> "Future[Dict[str, Any]]":
+        raise NotImplementedError
+
+    def check(self, source: str) -> Dict[str, Any]:
+        return self.submit(source).result()
+
+    def prefetch(self, sources: Iterable[str]) -> None:
+        """Start compiling `sources` so that later `check` calls find them done or in flight."""
+        for source in sources:
+            self.submit(source)
+
+    def identity(self) -> Optional[str]:
+        """What a compile result depends on besides the source (compiler version, settings); None if nothing is compiled."""
+        return None
+
+    def spec(self) -> Tuple[str, str]:
+        """(backend name, settings) from which a worker process rebuilds an equivalent backend."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "CompileBackend":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class NullBackend(CompileBackend):
+    """The artifact's default: compilation is not checked and the placeholder postcondition holds."""
+    postcondition = "compiles_placeholder"
+    _OK: Dict[str, Any] = {"ok": True, "errors": []}
+
+    def submit(self, source: str) -> "Future[Dict[str, Any]]":
+        fut: "Future[Dict[str, Any]]" = Future()
+        fut.set_result(self._OK)
+        return fut
+
+    def check(self, source: str) -> Dict[str, Any]:
+        return self._OK
+
+    def prefetch(self, sources: Iterable[str]) -> None:
+        pass
+
+    def spec(self) -> Tuple[str, str]:
+        return ("none", "{}")
+
+DEFAULT_SOLC_SETTINGS: Dict[str, Any] = {
+    "optimizer": {"enabled": False},
+    # ABI only: enough for full analysis, no code generation
+    "outputSelection": {"*": {"*": ["abi"]}},
+}
+
+class SolcBackend(CompileBackend):
+    """Compile checks with a local `solc` through its --standard-json interface.
+
+    `binary` is a path or a command line (e.g. "python scripts/solc_stub.py").
+    Checks run on a pool of `workers` long-lived threads, each driving one solc
+    process per compile; solc has no request loop of its own, so the pool is what
+    stays warm. A source already being compiled is not compiled again: later
+    requests wait on the same future. `cache_dir` adds a disk tier to the cache,
+    shared by every process that points at it.
+    """
+
+    def __init__(self, binary: Union[str, List[str]] = "solc", settings: Optional[Dict[str, Any]] = None,
+                 workers: int = 4, cache_dir: Optional[Path] = None, timeout: float = 120.0):
+        import shlex
+        self.binary = binary
+        self.command = shlex.split(binary) if isinstance(binary, str) else list(binary)
+        self.settings = settings if settings is not None else DEFAULT_SOLC_SETTINGS
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.version = self._version()
+        self.cache = TieredStore(cache_dir)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="solc")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future[Dict[str, Any]]"] = {}
+        self._counters = {"compiles": 0, "cache_hits": 0, "inflight_joins": 0}
+
+    def _version(self) -> str:
+        import subprocess
+        try:
+            proc = subprocess.run(self.command + ["--version"], capture_output=True, text=True, timeout=self.timeout)
+        except OSError as e:
+            raise RuntimeError(f"cannot run {self.binary}: {e}") from e
+        if proc.returncode != 0:
+            raise RuntimeError(f"{self.binary} --version failed: {proc.stderr.strip()}")
+        return proc.stdout.strip().splitlines()[-1]
+
+    def identity(self) -> str:
+        return self.version + "\0" + json.dumps(self.settings, sort_keys=True)
+
+    def key(self, source: str) -> str:
+        h = hashlib.sha256()
+        for part in (self.identity(), source):
+            h.update(part.encode("utf-8") + b"\0")
+        return h.hexdigest()
+
+    def submit(self, source: str) -> "Future[Dict[str, Any]]":
+        key = self.key(source)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self._counters["inflight_joins"] += 1
+                return fut
+            cached, _ = self.cache.get(key)
+            if cached is not None:
+                self._counters["cache_hits"] += 1
+                fut = Future()
+                fut.set_result(cached)
+                return fut
+            self._counters["compiles"] += 1
+            fut = self._pool.submit(self._compile, source)
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._done(key, f))
+        return fut
+
+    def _done(self, key: str, fut: "Future[Dict[str, Any]]") -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if not fut.cancelled() and fut.exception() is None:
+                self.cache.put(key, fut.result())
+
+    def _compile(self, source: str) -> Dict[str, Any]:
+        import subprocess
+        request = {"language": "Solidity", "sources": {"patched.sol": {"content": source}}, "settings": self.settings}
+        proc = subprocess.run(self.command + ["--standard-json"], input=json.dumps(request), capture_output=True,
+                              text=True, timeout=self.timeout)
+        try:
+            output = json.loads(proc.stdout)
+        except ValueError:
+            raise RuntimeError(f"{self.binary} gave no standard-json output (exit {proc.returncode}): "
+                               f"{proc.stderr.strip()[:200]}")
+        errors = [e.get("formattedMessage") or e.get("message", "") for e in output.get("errors", [])
+                  if e.get("severity") == "error"]
+        return {"ok": not errors, "errors": errors}
+
+    def spec(self) -> Tuple[str, str]:
+        return ("solc", json.dumps({
+            "binary": self.binary,
+            "settings": self.settings,
+            "workers": self.workers,
+            "cache_dir": str(self.cache_dir) if self.cache_dir is not None else None,
+            "timeout": self.timeout,
+        }, sort_keys=True))
+
+    def stats(self) -> Dict[str, int]:
+        out = dict(self._counters)
+        out.update({f"cache_{k}": v for k, v in self.cache.stats().items()})
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+BACKENDS = {"none": NullBackend, "solc": SolcBackend}
+
+_BY_SPEC: Dict[Tuple[str, str], CompileBackend] = {}
+
+def make_backend(name: str = "none", **kwargs: Any) -> CompileBackend:
+    cls = BACKENDS[name]
+    backend = cls(**kwargs) if kwargs else cls()
+    _BY_SPEC.setdefault(backend.spec(), backend)
+    return backend
+
+def backend_from_spec(spec: Optional[Tuple[str, str]]) -> Optional[CompileBackend]:
+    """The backend described by `spec`, built once per process (worker processes share it across jobs)."""
+    if spec is None:
+        return None
+    spec = tuple(spec)
+    if spec not in _BY_SPEC:
+        name, settings = spec
+        kwargs = json.loads(settings)
+        if kwargs.get("cache_dir") is not None:
+            kwargs["cache_dir"] = Path(kwargs["cache_dir"])
+        _BY_SPEC[spec] = BACKENDS[name](**kwargs)
+    return _BY_SPEC[spec]
@@ -0,0 +1,308 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# `safeprompt` command line. Only argparse is imported up front: every subcommand
+# imports what it needs when it runs, so `--help` and small repairs start fast
+# (see scripts/check_startup.py) and pandas/tabulate are loaded by `tables` alone.
+
+def _add_compiler_args(p: argparse.ArgumentParser, per_process: str = "") -> None:
+    p.add_argument("--compiler", choices=("none", "solc"), default="none",
+                   help="Compile-check backend for the compiles postcondition (default: placeholder)")
+    p.add_argument("--solc", default="solc", help="solc binary or command line, e.g. \"python scripts/solc_stub.py\"")
+    p.add_argument("--compile-workers", type=int, default=4, help="Compiler worker threads" + per_process)
+    p.add_argument("--compile-cache", default=None, help="Directory for the on-disk compile result cache")
+
+def _add_hash_cache_args(p: argparse.ArgumentParser, default: str) -> None:
+    p.add_argument("--hash-cache", default=None, help=f"JSON file of file hashes keyed by size and mtime (default: {default})")
+    p.add_argument("--no-hash-cache", action="store_true", help="Re-read every file instead of trusting the hash cache")
+
+def _compiler(args: argparse.Namespace):
+    if args.compiler != "solc":
+        return None
+    from .cert.compiler import make_backend
+    return make_backend("solc", binary=args.solc, workers=args.compile_workers,
+                        cache_dir=Path(args.compile_cache) if args.compile_cache else None)
+
+def _hash_cache(args: argparse.Namespace, default: Path):
+    from .utils import HashCache
+    if args.no_hash_cache:
+        return HashCache()
+    return HashCache(Path(args.hash_cache) if args.hash_cache else default)
+
+def _cmd_repair(args: argparse.Namespace) -> int:
+    from .instrument import Instrumentation, SummarySink
+    from .pipeline import repair
+
+    instrument = None
+    if args.timings or args.profile or args.trace_memory:
+        instrument = Instrumentation(sinks=[SummarySink()], profile_path=Path(args.profile) if args.profile else None,
+                                     trace_memory=args.trace_memory)
+
+    compiler = _compiler(args)
+    try:
+        if args.op_workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.op_workers) as executor:
+                result = repair(Path(args.contract), Path(args.witness), Path(args.out), executor=executor,
+                                instrument=instrument, incremental=args.incremental, compiler=compiler)
+        else:
+            result = repair(Path(args.contract), Path(args.witness), Path(args.out), instrument=instrument,
+                            incremental=args.incremental, compiler=compiler)
+    finally:
+        if compiler is not None:
+            compiler.close()
+    print("Wrote:", Path(args.out).resolve())
+    if compiler is not None:
+        print("Compiler:", compiler.version, " ", "  ".join(f"{k}: {v}" for k, v in sorted(compiler.stats().items())))
+    accepted = result.get("accepted")
+    if isinstance(accepted, list) and accepted:
+        for entry in accepted:
+            print(f"Accepted operator for {entry['function']}:", entry["operator"])
+    elif accepted:
+        print("Accepted operator:", accepted["operator"])
+    else:
+        print("No repair accepted. See run_summary.json for details.")
+    return 0
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    import json
+    import time
+    from .instrument import JsonlSink, PrometheusSink
+    from .pipeline import load_jobs, repair_many
+
+    sinks = []
+    if args.metrics_jsonl:
+        sinks.append(JsonlSink(Path(args.metrics_jsonl)))
+    if args.prometheus:
+        sinks.append(PrometheusSink(Path(args.prometheus)))
+
+    out_root = Path(args.out)
+    out_root.mkdir(parents=True, exist_ok=True)
+    jobs = load_jobs(Path(args.manifest or args.dir), out_root)
+    checkpoint = None
+    if args.shards:
+        from .shard import Checkpoint, checkpoint_path, select_shard
+        jobs = select_shard(jobs, out_root, args.shard, args.shards)
+        checkpoint = Checkpoint(checkpoint_path(out_root, args.shard, args.shards), args.shard, args.shards,
+                                len(jobs), out_root, resume=args.resume)
+    store = None
+    if args.store:
+        from .store import ResultStore
+        store = ResultStore(Path(args.store))
+    # fails early if the binary is missing; workers rebuild the backend from its spec
+    compiler = _compiler(args)
+
+    accepted = failed = 0
+    cache_tiers = {}
+    clones = {}
+    reused = 0
+    todo = jobs
+    if checkpoint is not None:
+        # a resumed shard reports the jobs it logged before together with the new ones
+        todo = [job for job in jobs if checkpoint.key(job) not in checkpoint.done]
+        for result in checkpoint.done.values():
+            failed += bool(result.get("error"))
+            accepted += not result.get("error") and bool(result.get("accepted"))
+    summary_path = checkpoint.path if checkpoint is not None else out_root / "batch_summary.jsonl"
+    t0 = time.perf_counter()
+    with (checkpoint if checkpoint is not None else summary_path.open("w", encoding="utf-8")) as f:
+        for result in repair_many(todo, workers=args.workers, chunksize=args.chunksize, ordered=not args.unordered,
+                                  rcg_cache_dir=Path(args.rcg_cache) if args.rcg_cache else None,
+                                  timings=args.timings or bool(sinks),
+                                  clone_memo_dir=Path(args.clone_memo) if args.clone_memo else None,
+                                  incremental=args.incremental, store=store, store_root=out_root,
+                                  compiler=compiler):
+            if checkpoint is not None:
+                checkpoint.append(result)
+            else:
+                f.write(json.dumps(result, sort_keys=True) + "\n")
+            for sink in sinks:
+                sink.emit(result.get("timings", {}), result)
+            for target in result.get("targets", [result]):
+                reused += bool(target.get("reused"))
+                if "rcg_cache" in target:
+                    cache_tiers[target["rcg_cache"]] = cache_tiers.get(target["rcg_cache"], 0) + 1
+                for attempt in target.get("attempted", []):
+                    if "clone" in attempt:
+                        clones[attempt["clone"]] = clones.get(attempt["clone"], 0) + 1
+            if result.get("error"):
+                failed += 1
+            elif result.get("accepted"):
+                accepted += 1
+    elapsed = time.perf_counter() - t0
+    for sink in sinks:
+        sink.close()
+    if store is not None:
+        store.close()
+    if compiler is not None:
+        compiler.close()
+
+    if checkpoint is not None:
+        print(f"Shard {args.shard} of {args.shards}:", len(jobs) - len(todo), "jobs resumed from the checkpoint")
+    print(f"Jobs: {len(jobs)}  accepted: {accepted}  abstained: {len(jobs) - accepted - failed}  errors: {failed}")
+    if todo:
+        print(f"Elapsed: {elapsed:.2f}s  ({len(todo) / elapsed:.1f} contracts/s)")
+    if cache_tiers:
+        print("RCG cache:", "  ".join(f"{k}: {v}" for k, v in sorted(cache_tiers.items())))
+    if args.incremental:
+        print("Targets reused from the previous run:", reused)
+    if clones:
+        lookups = sum(clones.values())
+        hits = clones.get("exact", 0)  # a rerun still runs the operator
+        print(f"Clone memo: {hits}/{lookups} hits ({100.0 * hits / lookups:.1f}%)  ",
+              "  ".join(f"{k}: {v}" for k, v in sorted(clones.items())))
+    print("Wrote:", summary_path.resolve())
+    if store is not None:
+        print("Wrote:", store.path.resolve())
+    for sink in sinks:
+        print("Wrote:", sink.path.resolve())
+    return 0
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    from .shard import merge_checkpoints, write_aggregate, write_repair_csvs
+    paths = []
+    for arg in args.checkpoints:
+        p = Path(arg)
+        paths += sorted(p.rglob("checkpoint-*-of-*.jsonl")) if p.is_dir() else [p]
+    if not paths:
+        print("No checkpoints found.")
+        return 1
+    try:
+        aggregate = merge_checkpoints(paths, allow_partial=args.allow_partial)
+    except ValueError as e:
+        print("Merge failed:", e)
+        return 1
+    out = Path(args.out)
+    write_aggregate(aggregate, out)
+    print(f"Checkpoints: {len(paths)}  jobs: {aggregate['jobs']}  errors: {len(aggregate['errors'])}")
+    for vc, totals in aggregate["by_vuln_class"].items():
+        print(f"  {vc}: {totals['accepted']}/{totals['targets']} targets repaired")
+    print("Wrote:", out.resolve())
+    if args.csv_dir:
+        for path in write_repair_csvs(aggregate, Path(args.csv_dir), dataset=args.dataset):
+            print("Wrote:", path.resolve())
+    return 0
+
+def _cmd_tables(args: argparse.Namespace) -> int:
+    from .tables import reproduce_tables
+    out_md, out_tex = Path(args.out_md), Path(args.out_tex)
+    manifest = Path(args.manifest) if args.manifest else out_md.parent / "tables_manifest.json"
+    cache = _hash_cache(args, out_md.parent / ".hash_cache.json")
+    done = reproduce_tables(Path(args.data), out_md, out_tex, manifest_path=manifest, cache=cache,
+                            workers=args.workers, force=args.force)
+    print(f"Tables rendered: {len(done['rendered'])}  unchanged: {len(done['skipped'])}")
+    if done["untracked"]:
+        # a CSV without an entry in tables.TABLE_SPECS has no caption or label to render with
+        print(f"Warning: {len(done['untracked'])} CSV(s) in {args.data} not in TABLE_SPECS, not rendered:",
+              ", ".join(done["untracked"]), file=sys.stderr)
+    print("Wrote tables to:")
+    print(" -", out_md)
+    print(" -", out_tex)
+    return 0
+
+def _cmd_verify(args: argparse.Namespace) -> int:
+    from .verify import verify_outputs
+    root = Path(args.root)
+    cache = _hash_cache(args, root / "outputs" / ".hash_cache.json")
+    problems = verify_outputs(Path(args.expected), root, cache=cache, workers=args.workers)
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print("OK: all outputs match expected hashes.")
+        return 0
+    print("Verification failed.")
+    return 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="safeprompt", description="SafePrompt certified repair toolkit.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("repair", help="Repair one contract from a witness",
+                       description="Run a lightweight SafePrompt-style repair on one contract.")
+    p.add_argument("--contract", default="examples/contracts/ReentrancyVictim.sol", help="Path to Solidity contract")
+    p.add_argument("--witness", default="examples/witnesses/reentrancy_withdraw.json", help="Path to witness JSON")
+    p.add_argument("--out", default="outputs/demo_repair", help="Output directory")
+    p.add_argument("--op-workers", type=int, default=0, help="Evaluate candidate operators on this many worker processes")
+    p.add_argument("--incremental", action="store_true",
+                   help="Reuse unchanged targets from the run_summary.json already in --out")
+    _add_compiler_args(p)
+    p.add_argument("--timings", action="store_true", help="Add per-stage/per-operator timings to run_summary.json")
+    p.add_argument("--profile", default=None, help="Write a cProfile dump of the repair to this path")
+    p.add_argument("--trace-memory", action="store_true", help="Record the tracemalloc peak in the timings")
+    p.set_defaults(func=_cmd_repair)
+
+    p = sub.add_parser("batch", help="Repair many contract/witness pairs on a process pool",
+                       description="Run SafePrompt-style repairs over many contract/witness pairs.")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--manifest", help="JSON/JSONL manifest with contract, witness (and optional out) entries")
+    src.add_argument("--dir", help="Directory of *.sol contracts, each with a sibling <stem>.json witness")
+    p.add_argument("--out", default="outputs/batch_repair", help="Output root directory")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--chunksize", type=int, default=None, help="Jobs handed to a worker at a time")
+    p.add_argument("--unordered", action="store_true", help="Report results as they complete")
+    p.add_argument("--rcg-cache", default=None, help="Directory for the on-disk RCG cache (shared by all workers)")
+    p.add_argument("--clone-memo", default=None,
+                   help="Directory for the clone memo: certified edits reused across identical function bodies")
+    p.add_argument("--incremental", action="store_true",
+                   help="Reuse unchanged targets from the run summaries already in the output folders")
+    p.add_argument("--store", default=None,
+                   help="SQLite file to keep results in instead of per-run folders (see scripts/export_results.py)")
+    _add_compiler_args(p, per_process=" per worker process")
+    p.add_argument("--timings", action="store_true", help="Add per-stage/per-operator timings to each run summary")
+    p.add_argument("--metrics-jsonl", default=None, help="Append one timing record per job to this JSONL file")
+    p.add_argument("--prometheus", default=None, help="Write aggregated timings in Prometheus text format")
+    p.add_argument("--shards", type=int, default=None,
+                   help="Split the jobs into this many shards by a stable hash and run only --shard; finished jobs "
+                        "are logged to <out>/checkpoint-<shard>-of-<shards>.jsonl instead of batch_summary.jsonl")
+    p.add_argument("--shard", type=int, default=0, help="Shard to run, 0 <= shard < --shards")
+    p.add_argument("--resume", action="store_true", help="Skip the jobs already in this shard's checkpoint")
+    p.set_defaults(func=_cmd_batch)
+
+    p = sub.add_parser("merge", help="Merge the checkpoints of a sharded batch run",
+                       description="Merge shard checkpoints into one deterministic aggregate.")
+    p.add_argument("checkpoints", nargs="+", help="Checkpoint files, or directories searched for them")
+    p.add_argument("--out", default="outputs/merged_repair.json", help="Aggregate JSON to write")
+    p.add_argument("--csv-dir", default=None, help="Also write a data/*_repair.csv style table per vulnerability class")
+    p.add_argument("--dataset", default="Vulnerable", help="Value of the dataset column of those tables")
+    p.add_argument("--allow-partial", action="store_true", help="Merge even if shards are missing or unfinished")
+    p.set_defaults(func=_cmd_merge)
+
+    p = sub.add_parser("tables", help="Reproduce the paper tables from CSVs",
+                       description="Reproduce SafePrompt paper tables from CSVs.")
+    p.add_argument("--data", default="data", help="Directory containing CSV files.")
+    p.add_argument("--out-md", "--out_md", dest="out_md", default="outputs/tables_md",
+                   help="Output directory for markdown tables.")
+    p.add_argument("--out-tex", "--out_tex", dest="out_tex", default="outputs/tables_tex",
+                   help="Output directory for LaTeX tables.")
+    p.add_argument("--manifest", default=None,
+                   help="Input/output hashes of the last run; unchanged tables are skipped "
+                        "(default: tables_manifest.json next to --out-md)")
+    p.add_argument("--force", action="store_true", help="Render every table, ignoring the manifest")
+    p.add_argument("--workers", type=int, default=None, help="Rendering processes (default: CPU count)")
+    _add_hash_cache_args(p, ".hash_cache.json next to --out-md")
+    p.set_defaults(func=_cmd_tables)
+
+    p = sub.add_parser("verify", help="Check reproduced outputs against expected hashes",
+                       description="Verify reproduced table outputs against expected hashes.")
+    p.add_argument("--expected", default="docs/expected_hashes.json", help="JSON map of relative path to sha256")
+    p.add_argument("--root", default=".", help="Directory the paths in --expected are relative to")
+    p.add_argument("--workers", type=int, default=None, help="Hashing threads")
+    _add_hash_cache_args(p, "<root>/outputs/.hash_cache.json")
+    p.set_defaults(func=_cmd_verify)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command == "batch":
+        if args.shards is not None and not 0 <= args.shard < args.shards:
+            parser.error(f"--shard must be between 0 and {args.shards - 1}")
+        if args.resume and args.shards is None:
+            parser.error("--resume needs --shards (use --shards 1 for a resumable unsharded run)")
+    return args.func(args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cert.checker import MUTEX_MARKER
+from .cert.compiler import CompileBackend
+from .memo import BodyPrint
+from .operators.registry import registry
+from .rcg.build_rcg import ANALYSER_VERSION
+from .rcg.index import ContractIndex
+from .utils import Witness
+
+def target_fingerprint(index: ContractIndex, fp: BodyPrint, wit: Witness,
+                       compiler: Optional[CompileBackend] = None) -> Dict[str, str]:
+    """Span and dependency hashes of one target, as recorded in run summaries.
+
+    "span" hashes the lines of the function. "deps" covers what the repair of that
+    function reads outside of it: analyser version, the operators of the class in
+    priority order, where operators and checker anchor on the function, and whether
+    the rest of the file already carries a mutex guard, the inter-procedural
+    predicates from the call graph; with a compile backend, also the compiler
+    version and settings.
+    """
+    src = index.source
+    ops = [op.name for op in registry().families().get(wit.vuln_class, [])]
+    mutex_elsewhere = src.find(MUTEX_MARKER, 0, fp.start) != -1 or src.find(MUTEX_MARKER, fp.end) != -1
+    h = hashlib.sha256()
+    calls = index.call_graph().predicates(wit.function)
+    for part in (ANALYSER_VERSION, wit.vuln_class, ",".join(ops), "%d,%d" % fp.anchors, str(mutex_elsewhere),
+                 json.dumps(calls, sort_keys=True)):
+        h.update(part.encode("utf-8") + b"\0")
+    identity = compiler.identity() if compiler is not None else None
+    if identity is not None:
+        h.update(identity.encode("utf-8") + b"\0")
+    return {"span": fp.exact, "deps": h.hexdigest()}
+
+_RUN_KEYS = ("contract", "timings", "job", "error")
+
+class PreviousRun:
+    """Target entries of an earlier run summary, for incremental re-repair."""
+
+    def __init__(self, summary: Dict[str, Any]):
+        if "targets" in summary:
+            entries = summary["targets"]
+        else:
+            # a single-target summary: everything but the run-level keys describes the target
+            entries = [{k: v for k, v in summary.items() if k not in _RUN_KEYS}]
+        self._by_target = {(e.get("function"), e.get("vuln_class")): e for e in entries if "fingerprint" in e}
+
+    @staticmethod
+    def load(path: Path) -> Optional["PreviousRun"]:
+        """The run summary at `path`, or None if there is no usable one."""
+        try:
+            return PreviousRun(json.loads(Path(path).read_text(encoding="utf-8")))
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def lookup(self, wit: Witness, fingerprint: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """The previous entry for this target if neither its span nor its dependencies changed."""
+        entry = self._by_target.get((wit.function, wit.vuln_class))
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        return entry
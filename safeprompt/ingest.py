@@ -0,0 +1,64 @@
+from __future__ import annotations
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+# Source ingestion for large (flattened) contracts. A file is mapped once and decoded
+# once; everything downstream works on offsets into that single string, and operators
+# describe their patches as edits on spans so the patched file is built by one splice.
+
+def read_source(path: Path) -> str:
+    """Decode a Solidity file through mmap, with the same newline handling as `Path.read_text`."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, "utf-8")
+            has_cr = mm.find(b"\r") != -1
+    if has_cr:
+        # universal newlines, as text-mode reads do
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+def iter_lines(src: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """(start, end) offsets of each line from the one containing `start`; `end` includes the newline."""
+    pos = src.rfind("\n", 0, start) + 1
+    n = len(src)
+    while pos < n:
+        nl = src.find("\n", pos)
+        end = n if nl == -1 else nl + 1
+        yield pos, end
+        pos = end
+
+_CONTRACT_LINE_RE = re.compile(r'^[^\S\n]*contract[^\n]*\{', re.M)
+
+def contract_body_start(src: str) -> Optional[int]:
+    """Offset of the line after the first `contract ... {` line, where operators declare state; None if none."""
+    m = _CONTRACT_LINE_RE.search(src)
+    if m is None:
+        return None
+    nl = src.find("\n", m.end())
+    return len(src) if nl == -1 else nl + 1
+
+class Edit(NamedTuple):
+    start: int
+    end: int
+    text: str
+
+def splice(src: str, edits: Iterable[Edit]) -> str:
+    """Apply non-overlapping edits in one pass; edits at the same offset keep their order."""
+    edits = sorted(edits, key=lambda e: (e.start, e.end))
+    if not edits:
+        return src
+    parts = []
+    pos = 0
+    for e in edits:
+        if e.start < pos:
+            raise ValueError(f"overlapping edits at offset {e.start}")
+        parts.append(src[pos:e.start])
+        parts.append(e.text)
+        pos = e.end
+    parts.append(src[pos:])
+    return "".join(parts)
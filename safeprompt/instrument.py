@@ -0,0 +1,215 @@
+from __future__ import annotations
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+class _Stage:
+    __slots__ = ("inst", "name", "operator", "t0")
+
+    def __init__(self, inst: "Instrumentation", name: str, operator: Optional[str]):
+        self.inst = inst
+        self.name = name
+        self.operator = operator
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.inst.record(self.name, time.perf_counter() - self.t0, self.operator)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Instrumentation:
+    """Per-stage and per-operator timers and counters for one or more repairs.
+
+    `profile_path` captures a cProfile dump of the run, `trace_memory` records the
+    tracemalloc peak. Sinks receive the finished report (see `SummarySink`,
+    `JsonlSink`, `PrometheusSink`).
+    """
+
+    def __init__(self, sinks: Iterable[Any] = (), profile_path: Optional[Path] = None, trace_memory: bool = False):
+        self.sinks = list(sinks)
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, List[float]] = {}        # name -> [seconds, calls]
+        self.operators: Dict[str, Dict[str, List[float]]] = {}
+        self.counters: Dict[str, int] = {}
+        self._profiler = None
+        self._peak_memory: Optional[int] = None
+
+    def stage(self, name: str, operator: Optional[str] = None) -> _Stage:
+        return _Stage(self, name, operator)
+
+    def record(self, name: str, seconds: float, operator: Optional[str] = None, calls: int = 1) -> None:
+        bucket = self.operators.setdefault(operator, {}) if operator is not None else self.stages
+        acc = bucket.setdefault(name, [0.0, 0])
+        acc[0] += seconds
+        acc[1] += calls
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, report: Dict[str, Any]) -> None:
+        """Fold a report produced elsewhere (e.g. in a worker process) into this one."""
+        for name, st in report.get("stages", {}).items():
+            self.record(name, st["ms"] / 1000.0, calls=st["calls"])
+        for op, stages in report.get("operators", {}).items():
+            for name, st in stages.items():
+                self.record(name, st["ms"] / 1000.0, op, calls=st["calls"])
+        for name, n in report.get("counters", {}).items():
+            self.count(name, n)
+
+    def start(self) -> None:
+        if self.profile_path is not None:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(str(self.profile_path))
+            self._profiler = None
+        if self.trace_memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                self._peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+    def report(self) -> Dict[str, Any]:
+        def fmt(bucket):
+            return {name: {"ms": round(acc[0] * 1000.0, 3), "calls": int(acc[1])} for name, acc in bucket.items()}
+
+        out: Dict[str, Any] = {
+            "stages": fmt(self.stages),
+            "operators": {op: fmt(stages) for op, stages in self.operators.items()},
+            "counters": dict(self.counters),
+        }
+        if self._peak_memory is not None:
+            out["peak_memory_bytes"] = self._peak_memory
+        if self.profile_path is not None:
+            out["profile"] = str(self.profile_path)
+        return out
+
+    def emit(self, summary: Dict[str, Any]) -> None:
+        report = self.report()
+        for sink in self.sinks:
+            sink.emit(report, summary)
+
+class NullInstrumentation(Instrumentation):
+    """Stand-in used when instrumentation is off; stages cost a method call and nothing else."""
+
+    def stage(self, name: str, operator: Optional[str] = None) -> _NullStage:
+        return _NULL_STAGE
+
+    def record(self, name: str, seconds: float, operator: Optional[str] = None, calls: int = 1) -> None:
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+class SummarySink:
+    """Adds the report as a `timings` section of run_summary.json."""
+
+    def emit(self, report: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        summary["timings"] = report
+
+class JsonlSink:
+    """Appends one JSON line per repair with the contract, function, outcome and report."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f: Optional[TextIO] = None
+
+    def emit(self, report: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        if self._f is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = self.path.open("a", encoding="utf-8")
+        accepted = summary.get("accepted")
+        self._f.write(json.dumps({
+            "contract": summary.get("contract"),
+            "function": summary.get("function"),
+            "vuln_class": summary.get("vuln_class"),
+            "accepted": ([a["operator"] for a in accepted] if isinstance(accepted, list)
+                         else accepted["operator"] if accepted else None),
+            "error": summary.get("error"),
+            **report,
+        }, sort_keys=True) + "\n")
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+def _label(value: str) -> str:
+    # operator names come from plugins, so escape them as the text format requires
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class PrometheusSink:
+    """Aggregates reports across a batch and writes them in Prometheus text format on close()."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.inst = Instrumentation()
+        self.repairs: Dict[str, int] = {}
+
+    def emit(self, report: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        self.inst.merge(report)
+        outcome = "error" if summary.get("error") else "accepted" if summary.get("accepted") else "abstained"
+        self.repairs[outcome] = self.repairs.get(outcome, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP safeprompt_repairs_total Repairs by outcome.",
+            "# TYPE safeprompt_repairs_total counter",
+        ]
+        lines += [f'safeprompt_repairs_total{{outcome="{k}"}} {v}' for k, v in sorted(self.repairs.items())]
+        lines += [
+            "# HELP safeprompt_stage_seconds_total Time spent per pipeline stage.",
+            "# TYPE safeprompt_stage_seconds_total counter",
+        ]
+        lines += [f'safeprompt_stage_seconds_total{{stage="{k}"}} {v[0]:.6f}' for k, v in sorted(self.inst.stages.items())]
+        lines += [
+            "# HELP safeprompt_stage_calls_total Calls per pipeline stage.",
+            "# TYPE safeprompt_stage_calls_total counter",
+        ]
+        lines += [f'safeprompt_stage_calls_total{{stage="{k}"}} {int(v[1])}' for k, v in sorted(self.inst.stages.items())]
+        lines += [
+            "# HELP safeprompt_operator_seconds_total Time spent per operator and stage.",
+            "# TYPE safeprompt_operator_seconds_total counter",
+        ]
+        for op, stages in sorted(self.inst.operators.items()):
+            lines += [f'safeprompt_operator_seconds_total{{operator="{_label(op)}",stage="{k}"}} {v[0]:.6f}'
+                      for k, v in sorted(stages.items())]
+        lines += [
+            "# HELP safeprompt_operator_calls_total Calls per operator and stage.",
+            "# TYPE safeprompt_operator_calls_total counter",
+        ]
+        for op, stages in sorted(self.inst.operators.items()):
+            lines += [f'safeprompt_operator_calls_total{{operator="{_label(op)}",stage="{k}"}} {int(v[1])}'
+                      for k, v in sorted(stages.items())]
+        lines += [
+            "# HELP safeprompt_counter_total Pipeline counters.",
+            "# TYPE safeprompt_counter_total counter",
+        ]
+        lines += [f'safeprompt_counter_total{{name="{k}"}} {v}' for k, v in sorted(self.inst.counters.items())]
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(self.render(), encoding="utf-8")
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ingest import Edit, contract_body_start
+from .rcg.build_rcg import ANALYSER_VERSION
+from .rcg.cache import TieredStore
+from .rcg.index import ContractIndex
+
+# strings are matched first so that "//" inside a literal is not taken for a comment
+_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')|//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)')
+_WS_RE = re.compile(r'\s+')
+
+def normalize_body(text: str) -> str:
+    """Function text with comments removed and whitespace runs collapsed."""
+    text = _COMMENT_RE.sub(lambda m: m.group(1) or " ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+@dataclass(frozen=True)
+class BodyPrint:
+    """Where a target function sits in its file and what its body hashes to."""
+    start: int
+    end: int
+    exact: str
+    normalized: str
+    anchors: Tuple[int, int]
+    header: Optional[int] = None    # contract_body_start of the file, where contract-level declarations go
+
+def body_print(index: ContractIndex, fn_name: str) -> BodyPrint:
+    fn = index.function(fn_name)
+    start = index.line_offsets[fn.start_line - 1]
+    end = index.line_offsets[fn.end_line] if fn.end_line < len(index.line_offsets) else len(index.source)
+    text = index.source[start:end]
+    # where operators and the checker find the function; a reused edit is only valid if both agree
+    m = re.search(rf'function\s+{re.escape(fn_name)}\b', index.source)
+    anchors = (index.source.find("function " + fn_name) - start, (m.start() if m else len(index.source)) - start)
+    return BodyPrint(
+        start=start,
+        end=end,
+        exact=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        normalized=hashlib.sha256(normalize_body(text).encode("utf-8")).hexdigest(),
+        anchors=anchors,
+        header=contract_body_start(index.source),
+    )
+
+def relative_edits(fp: BodyPrint, edits: List[Edit]) -> Optional[List[List[Any]]]:
+    """`edits` relative to the function's first line, or None if any reaches outside the function."""
+    if not all(fp.start <= e.start and e.end <= fp.end for e in edits):
+        return None
+    return [[e.start - fp.start, e.end - fp.start, e.text] for e in edits]
+
+def reanchor(edits: List[List[Any]], fp: BodyPrint) -> List[Edit]:
+    return [Edit(fp.start + s, fp.start + e, text) for s, e, text in edits]
+
+def _header_outside(fp: BodyPrint) -> bool:
+    # the contract body start lies before the function's first line or after its last
+    return fp.header is not None and (fp.header <= fp.start or fp.header >= fp.end)
+
+def _fits(fp: BodyPrint, starts: List[int]) -> bool:
+    # function edits at `starts` and insertions at the contract body start can be placed without
+    # the two sharing an offset (where their order would be lost)
+    return fp.header is None or (_header_outside(fp) and fp.header not in starts)
+
+# bumped when the entry layout changes, so older entries are not read
+MEMO_VERSION = 3
+
+class CloneMemo(TieredStore):
+    """Checked repairs of function bodies, reused across forked/cloned contracts.
+
+    Entries are keyed by the normalized body hash (comments and whitespace stripped),
+    the vulnerability class and the operator name, and hold the operator's edits
+    relative to the function's first line; a contract-level declaration (as added by
+    mutex_guard) is kept relative to the contract body start instead. Rejected
+    candidates are recorded as well as certified ones. A later target whose body is
+    byte-identical (an "exact" hit) gets those edits re-anchored into its own file
+    instead of running the operator. A clone that differs only in comments or layout,
+    or whose edits reach elsewhere outside the function, still runs the operator (a
+    "rerun", which is not counted as a hit). Either way the patched file is checked
+    by `check_patch` as usual; exact hits only skip the checks that read the function
+    body.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, **kwargs: Any):
+        super().__init__(directory, **kwargs)
+        self.clone_counters = {"exact": 0, "rerun": 0, "miss": 0}
+
+    @staticmethod
+    def memo_key(fp: BodyPrint, vuln_class: str, op_name: str) -> str:
+        h = hashlib.sha256()
+        for part in (ANALYSER_VERSION, str(MEMO_VERSION), vuln_class, op_name, fp.normalized):
+            h.update(part.encode("utf-8") + b"\0")
+        return h.hexdigest()
+
+    def lookup(self, fp: BodyPrint, vuln_class: str, op_name: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """The memo entry and the hit kind: "exact", "rerun" or "miss"."""
+        entry, _ = self.get(self.memo_key(fp, vuln_class, op_name))
+        if entry is None:
+            kind = "miss"
+        elif (entry["exact"] == fp.exact and tuple(entry["anchors"]) == fp.anchors and entry["edits"] is not None
+              and entry["has_header"] == (fp.header is not None)
+              and _fits(fp, [fp.start + e[0] for e in entry["edits"]])):
+            kind = "exact"
+        else:
+            kind = "rerun"
+        self.clone_counters[kind] += 1
+        return entry, kind
+
+    def record(self, fp: BodyPrint, vuln_class: str, op_name: str, edits: List[Edit], meta: Dict[str, str],
+               body_checks: Dict[str, bool]) -> None:
+        # insertions at the contract body start keep only their text; a hit places them at its own file's.
+        # Whether the operator finds a body start decides what it adds, so a hit needs one exactly when
+        # this file had one.
+        at = fp.header if _header_outside(fp) else None
+        header = [e.text for e in edits if e.start == e.end == at]
+        inside = [e for e in edits if not e.start == e.end == at]
+        self.put(self.memo_key(fp, vuln_class, op_name), {
+            "exact": fp.exact,
+            "anchors": list(fp.anchors),
+            "edits": relative_edits(fp, inside) if _fits(fp, [e.start for e in inside]) else None,
+            "header": header,
+            "has_header": fp.header is not None,
+            "meta": meta,
+            "body_checks": body_checks,
+        })
+
+    @staticmethod
+    def edits(entry: Dict[str, Any], fp: BodyPrint) -> List[Edit]:
+        """The edits of an "exact" hit `entry`, placed in the file of `fp`."""
+        return reanchor(entry["edits"], fp) + [Edit(fp.header, fp.header, text) for text in entry["header"]]
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(super().stats())
+        out.update(self.clone_counters)
+        lookups = sum(self.clone_counters.values())
+        out["clone_hit_rate"] = self.clone_counters["exact"] / lookups if lookups else 0.0
+        return out
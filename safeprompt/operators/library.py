@@ -1,132 +1,155 @@
 
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import KW_ONLY, dataclass, field
 from typing import Callable, Dict, List, Optional, Tuple
 
+from ..cert.checker import changed_region
+from ..ingest import Edit, contract_body_start, iter_lines, splice
+
 @dataclass(frozen=True)
 class Operator:
     name: str
     family: str
     description: str
-    applicable: Callable[[Dict[str, bool]], bool]
-    apply: Callable[[str, str], Tuple[str, Dict[str, str]]]
-    # apply(sol_src, fn_name) -> (new_src, metadata)
+    applicable: Optional[Callable[[Dict[str, bool]], bool]] = None
+    # custom applicability test, only for operators that cannot be expressed via `requires`
+    apply: Optional[Callable[[str, str], Tuple[str, Dict[str, str]]]] = None
+    # apply(sol_src, fn_name) -> (new_src, metadata); defaults to splicing in `edits`
+    _: KW_ONLY
+    requires: Tuple[str, ...] = ()
+    # predicates that must all hold; the registry dispatches on these as a bitmask
+    edits: Optional[Callable[[str, str], Tuple[List[Edit], Dict[str, str]]]] = None
+    # edits(sol_src, fn_name) -> ([(start, end, text), ...], metadata)
 
-def op_mutex_guard() -> Operator:
-    def applicable(pred: Dict[str, bool]) -> bool:
-        return pred.get("has_external_call", False)
+    custom_applicable: bool = field(init=False, default=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.apply is None:
+            if self.edits is None:
+                raise TypeError(f"operator {self.name!r} needs `apply` or `edits`")
+            object.__setattr__(self, "apply", _splicing(self.edits))
+        if self.applicable is None:
+            requires = self.requires
+            object.__setattr__(self, "applicable", lambda pred: all(pred.get(r, False) for r in requires))
+        else:
+            object.__setattr__(self, "custom_applicable", True)
+
+    def patch_edits(self, src: str, patched: str, fn_name: str) -> List[Edit]:
+        """The edits that turn `src` into `patched` (this operator's output for `fn_name`), minus no-op edits."""
+        if self.edits is not None:
+            edits = self.edits(src, fn_name)[0]
+        elif patched == src:
+            edits = []
+        else:
+            # operators without an edit list: treat the changed region as one replacement
+            start, end = changed_region(src, patched)
+            edits = [Edit(start, end, patched[start:end + len(patched) - len(src)])]
+        return [e for e in edits if src[e.start:e.end] != e.text]
 
+def _splicing(edits: Callable[[str, str], Tuple[List[Edit], Dict[str, str]]]):
     def apply(src: str, fn_name: str):
+        patch, meta = edits(src, fn_name)
+        return splice(src, patch), meta
+    return apply
+
+def op_mutex_guard() -> Operator:
+    def edits(src: str, fn_name: str):
         # Insert a simple nonReentrant guard pattern.
         # This is a minimal patch that avoids new imports.
         guard_decl = "    bool private __safeprompt_entered;\n"
         require_line = "        require(!__safeprompt_entered, \"REENTRANCY\");\n        __safeprompt_entered = true;\n"
         release_line = "        __safeprompt_entered = false;\n"
 
-        lines = src.splitlines(True)
-        # add guard state var after contract opening brace
-        out = []
-        inserted_decl = False
-        for i, line in enumerate(lines):
-            out.append(line)
-            if (not inserted_decl) and line.strip().startswith("contract") and "{" in line:
-                out.append(guard_decl)
-                inserted_decl = True
-
-        src2 = "".join(out)
-
         # insert require at function start and release before function return/end
-        lines = src2.splitlines(True)
-        out = []
-        in_fn = False
+        require, releases = [], []
+        needle = "function " + fn_name
         brace = 0
-        inserted_req = False
-        for line in lines:
-            if (not in_fn) and ("function "+fn_name) in line:
-                in_fn = True
-            if in_fn:
+        pos = src.find(needle)
+        while pos != -1:
+            for a, b in iter_lines(src, pos):
+                line = src[a:b]
                 if "{" in line:
                     brace += line.count("{")
-                    if (not inserted_req) and brace > 0:
-                        out.append(line)
-                        out.append(require_line)
-                        inserted_req = True
+                    if not require and brace > 0:
+                        require.append(Edit(b, b, require_line))
                         continue
                 brace -= line.count("}")
                 if "}" in line and brace == 0:
                     # before closing brace
-                    out.append(release_line)
-                    out.append(line)
-                    in_fn = False
-                    continue
-            out.append(line)
+                    releases.append(Edit(a, a, release_line))
+                    pos = src.find(needle, b)
+                    break
+            else:
+                break
 
-        return ("".join(out), {"guard": "bool __safeprompt_entered", "pattern": "mutex_guard"})
+        # add guard state var after contract opening brace
+        decl = []
+        at = contract_body_start(src)
+        if at is not None:
+            decl.append(Edit(at, at, guard_decl))
+
+        # at a shared offset: require (after a line), then the declaration, then a release (before a line)
+        return require + decl + releases, {"guard": "bool __safeprompt_entered", "pattern": "mutex_guard"}
 
     return Operator(
         name="mutex_guard",
         family="reentrancy",
         description="Insert a simple mutex-style nonReentrant guard within the target function.",
-        applicable=applicable,
-        apply=apply,
+        # the guard wraps the whole function, so it also covers external calls made by internal helpers
+        applicable=lambda pred: bool(pred.get("has_external_call") or pred.get("external_call_in_callee")),
+        edits=edits,
     )
 
 def op_cei_reorder() -> Operator:
-    def applicable(pred: Dict[str, bool]) -> bool:
-        # CEI reorder is meaningful only if both a state write and an external call exist.
-        return pred.get("has_external_call", False) and pred.get("has_state_write", False)
-
-    def apply(src: str, fn_name: str):
+    def edits(src: str, fn_name: str):
         # Heuristic: move the first state write line before the first external call line within the function.
-        lines = src.splitlines(True)
-        out = []
-        in_fn = False
-        brace = 0
+        pos = src.find("function " + fn_name)
         fn_lines = []
-        prefix = []
-        suffix = []
-        for line in lines:
-            if (not in_fn) and ("function "+fn_name) in line:
-                in_fn = True
-            if not in_fn:
-                prefix.append(line)
-                continue
-            fn_lines.append(line)
-            if "{" in line:
-                brace += line.count("{")
-            brace -= line.count("}")
-            if in_fn and brace == 0 and "}" in line:
-                in_fn = False
-                suffix = lines[len(prefix)+len(fn_lines):]
-                break
-
-        block = "".join(fn_lines)
-        blk_lines = block.splitlines(True)
+        brace = 0
+        if pos != -1:
+            for a, b in iter_lines(src, pos):
+                line = src[a:b]
+                fn_lines.append((a, b))
+                if "{" in line:
+                    brace += line.count("{")
+                brace -= line.count("}")
+                if brace == 0 and "}" in line:
+                    break
 
         ext_idx = None
         st_idx = None
-        for i, l in enumerate(blk_lines):
+        for i, (a, b) in enumerate(fn_lines):
+            l = src[a:b]
             if ext_idx is None and (".call" in l or ".transfer(" in l or ".send(" in l):
                 ext_idx = i
             if st_idx is None and ("=" in l and "==" not in l and "require(" not in l and "assert(" not in l):
                 st_idx = i
         if ext_idx is None or st_idx is None or st_idx < ext_idx:
-            return (src, {"pattern": "cei_reorder", "note": "no-op"})
+            return [], {"pattern": "cei_reorder", "note": "no-op"}
         # move st line before ext line
-        st_line = blk_lines.pop(st_idx)
-        blk_lines.insert(ext_idx, st_line)
-        new_block = "".join(blk_lines)
-        return ("".join(prefix) + new_block + "".join(suffix), {"pattern": "cei_reorder", "moved_line": st_line.strip()})
+        ext_start = fn_lines[ext_idx][0]
+        st_start, st_end = fn_lines[st_idx]
+        st_line = src[st_start:st_end]
+        return ([Edit(ext_start, st_end, st_line + src[ext_start:st_start])],
+                {"pattern": "cei_reorder", "moved_line": st_line.strip()})
 
     return Operator(
         name="cei_reorder",
         family="reentrancy",
         description="Reorder within the function to enforce checks-effects-interactions, moving a state update before the first external call when safe.",
-        applicable=applicable,
-        apply=apply,
+        # CEI reorder is meaningful only if both a state write and an external call exist.
+        requires=("has_external_call", "has_state_write"),
+        edits=edits,
     )
 
+def builtin_operators() -> List[Operator]:
+    # listed in priority order within each family
+    return [op_cei_reorder(), op_mutex_guard()]
+
 def operator_families() -> Dict[str, List[Operator]]:
-    return {
-        "reentrancy": [op_cei_reorder(), op_mutex_guard()],
-    }
+    from .registry import registry
+    return registry().families()
+
+def get_operator(family: str, name: str) -> Operator:
+    from .registry import registry
+    return registry().get(family, name)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+import warnings
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .library import Operator, builtin_operators
+from ..rcg.build_rcg import PREDICATES
+
+ENTRY_POINT_GROUP = "safeprompt.operators"
+
+class OperatorRegistry:
+    """Operators grouped by family, built once and dispatched by predicate bitmask.
+
+    Each operator's `requires` is compiled to a mask; the applicable operators for a
+    (family, predicate mask) pair are computed on first use and then served from a table.
+    Operators with a custom `applicable` callable are evaluated on the predicates the
+    mask stands for, so they are memoized the same way.
+    """
+
+    def __init__(self, operators: Iterable[Operator] = ()):
+        self._families: Dict[str, List[Operator]] = {}
+        self._bits: Dict[str, int] = {name: i for i, name in enumerate(PREDICATES)}
+        self._requires: Dict[Tuple[str, str], int] = {}
+        self._table: Dict[Tuple[str, int], Tuple[Operator, ...]] = {}
+        for op in operators:
+            self.register(op)
+
+    def register(self, op: Operator) -> None:
+        fam = self._families.setdefault(op.family, [])
+        if any(o.name == op.name for o in fam):
+            raise ValueError(f"operator '{op.name}' already registered in family '{op.family}'")
+        fam.append(op)
+        self._requires[(op.family, op.name)] = self._mask_of(op.requires)
+        self._table.clear()
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """Register third-party operators advertised under the `group` entry point.
+
+        An entry point may resolve to an Operator, an iterable of Operators, a
+        {family: [Operator]} mapping, or a zero-argument callable returning one of those.
+        """
+        from importlib.metadata import entry_points
+        for ep in entry_points(group=group):
+            try:
+                obj = ep.load()
+                if callable(obj) and not isinstance(obj, Operator):
+                    obj = obj()
+                if isinstance(obj, Operator):
+                    obj = [obj]
+                elif isinstance(obj, dict):
+                    obj = [op for ops in obj.values() for op in ops]
+                for op in obj:
+                    self.register(op)
+            except Exception as e:  # a broken plugin must not take the built-in operators down with it
+                warnings.warn(f"skipping operator plugin '{ep.name}': {type(e).__name__}: {e}")
+
+    def _bit(self, name: str) -> int:
+        if name not in self._bits:
+            self._bits[name] = len(self._bits)
+        return self._bits[name]
+
+    def _mask_of(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= 1 << self._bit(name)
+        return mask
+
+    def mask(self, predicates: Dict[str, bool]) -> int:
+        return self._mask_of(name for name, value in predicates.items() if value)
+
+    def predicates_of(self, mask: int) -> Dict[str, bool]:
+        return {name: bool(mask >> bit & 1) for name, bit in self._bits.items()}
+
+    def applicable(self, family: str, predicates: Dict[str, bool]) -> Tuple[Operator, ...]:
+        """Applicable operators of `family` in priority order."""
+        key = (family, self.mask(predicates))
+        ops = self._table.get(key)
+        if ops is None:
+            mask = key[1]
+            selected = []
+            for op in self._families.get(family, []):
+                if op.custom_applicable:
+                    ok = op.applicable(self.predicates_of(mask))
+                else:
+                    req = self._requires[(family, op.name)]
+                    ok = mask & req == req
+                if ok:
+                    selected.append(op)
+            ops = self._table[key] = tuple(selected)
+        return ops
+
+    def families(self) -> Dict[str, List[Operator]]:
+        return {fam: list(ops) for fam, ops in self._families.items()}
+
+    def get(self, family: str, name: str) -> Operator:
+        for op in self._families.get(family, []):
+            if op.name == name:
+                return op
+        raise KeyError(f"unknown operator '{name}' in family '{family}'")
+
+_REGISTRY: Optional[OperatorRegistry] = None
+
+def registry() -> OperatorRegistry:
+    """Process-wide registry: built-in operators followed by entry-point plugins."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        reg = OperatorRegistry(builtin_operators())
+        reg.load_entry_points()
+        _REGISTRY = reg
+    return _REGISTRY
@@ -1,45 +1,188 @@
 
 from __future__ import annotations
+import copy
 import json
-from dataclasses import asdict
+import os
+import time
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from dataclasses import asdict, dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Optional, Iterable, Iterator, List, Union
 
-from .utils import Witness
+from .utils import Witness, sha256_file
 from .rcg.build_rcg import build_rcg
-from .operators.library import operator_families
-from .cert.checker import check_patch
+from .rcg.index import ContractIndex
+from .rcg.cache import RCGCache
+from .operators.library import Operator, get_operator
+from .operators.registry import registry
+from .cert.checker import BaselineAnalysis, Certificate, CompositeCertificate, check_patch, scoped_unified_diff
+from .cert.compiler import CompileBackend, NullBackend, backend_from_spec
+from .ingest import Edit, read_source, splice
+from .incremental import PreviousRun, target_fingerprint
+from .memo import BodyPrint, CloneMemo, body_print, reanchor, relative_edits
+from .instrument import Instrumentation, NullInstrumentation, SummarySink
 
-def repair(solidity_path: Path, witness_path: Path, out_dir: Path) -> Dict[str, Any]:
-    """Run a lightweight SafePrompt-style detection-to-repair pass.
+if TYPE_CHECKING:
+    from .store import ResultStore  # sqlite3 is only loaded by runs that use a store
 
-    Inputs are intentionally simple for artifact reproducibility:
-    - solidity_path: path to the contract
-    - witness_path: JSON with vuln_class + function (+ optional hints)
-    Outputs:
-    - patched contract, certificate JSON, unified diff
+def _apply(op: Operator, src: str, vuln_class: str, fn_name: str, inst: Instrumentation,
+           memo: Optional[CloneMemo] = None, fp: Optional[BodyPrint] = None,
+           prefetched: Optional[Tuple[str, Dict[str, str], float]] = None):
+    entry, clone = memo.lookup(fp, vuln_class, op.name) if memo is not None else (None, None)
+    if clone is not None:
+        inst.count(f"clone_{clone}")
+    if clone == "exact":
+        # an identical body was checked before: re-anchor its edits instead of running the operator
+        with inst.stage("reanchor", op.name):
+            patched, meta = splice(src, memo.edits(entry, fp)), dict(entry["meta"])
+    elif prefetched is not None:
+        patched, meta, seconds = prefetched
+        inst.record("apply", seconds, op.name)
+    else:
+        with inst.stage("apply", op.name):
+            patched, meta = op.apply(src, fn_name)
+    return patched, meta, entry, clone
+
+def _prefetch(op: Operator, src: str, fn_name: str) -> Tuple[str, Dict[str, str], float]:
+    # the operator's output and how long it took, without touching the memo or instrumentation
+    t0 = time.perf_counter()
+    patched, meta = op.apply(src, fn_name)
+    return patched, meta, time.perf_counter() - t0
+
+def _evaluate(op: Operator, baseline: BaselineAnalysis, vuln_class: str, fn_name: str, predicates: Dict[str, bool],
+              full_certificates: bool, inst: Instrumentation, memo: Optional[CloneMemo] = None,
+              fp: Optional[BodyPrint] = None, compiler: Optional[CompileBackend] = None,
+              prefetched: Optional[tuple] = None) -> Tuple[str, Dict[str, str], bool, Certificate, Optional[str]]:
+    src = baseline.source
+    patched, meta, entry, clone = _apply(op, src, vuln_class, fn_name, inst, memo, fp, prefetched)
+    with inst.stage("check_patch", op.name):
+        ok, pending = check_patch(src, patched, vuln_class, op.name, fn_name, predicates, lazy=True, baseline=baseline,
+                                  body_checks=entry["body_checks"] if clone == "exact" else None, compiler=compiler)
+    if memo is not None and clone != "exact":
+        # rejections too, so an identical clone skips the operator whatever the verdict
+        memo.record(fp, vuln_class, op.name, op.patch_edits(src, patched, fn_name), meta, pending.body_checks)
+    # the diff is only worth computing for the candidate we keep
+    with inst.stage("certificate", op.name):
+        cert = pending.materialize(include_diff=ok or full_certificates)
+    return patched, meta, ok, cert, clone
+
+def _evaluate_candidate(vuln_class: str, family: str, op_name: str, baseline: BaselineAnalysis, fn_name: str,
+                        predicates: Dict[str, bool], full_certificates: bool, instrumented: bool,
+                        compiler_spec: Optional[Tuple[str, str]] = None):
+    # module-level and keyed by operator name so it can run in a worker process; the
+    # baseline travels with the call, so concurrent repairs on one executor never mix
+    inst = Instrumentation() if instrumented else NullInstrumentation()
+    result = _evaluate(get_operator(family, op_name), baseline, vuln_class, fn_name, predicates,
+                       full_certificates, inst, compiler=backend_from_spec(compiler_spec))
+    return (*result, inst.report() if instrumented else None)
+
+def _evaluate_serially(ops: List[Operator], baseline: BaselineAnalysis, wit: Witness, predicates: Dict[str, bool],
+                       full_certificates: bool, inst: Instrumentation, memo: Optional[CloneMemo] = None,
+                       fp: Optional[BodyPrint] = None, compiler: Optional[CompileBackend] = None):
+    prefetched: List[Optional[tuple]] = [None] * len(ops)
+    if compiler is not None and not isinstance(compiler, NullBackend) and len(ops) > 1:
+        # compiling dominates: apply every candidate up front so the compiler pool works
+        # on all of them while they are checked in priority order; memo lookups and
+        # apply timings are only counted for the candidates that are actually evaluated
+        prefetched = [_prefetch(op, baseline.source, wit.function) for op in ops]
+        compiler.prefetch(a[0] for a in prefetched)
+    for op, a in zip(ops, prefetched):
+        yield (op, *_evaluate(op, baseline, wit.vuln_class, wit.function, predicates, full_certificates, inst, memo, fp,
+                              compiler, a))
+
+def _evaluate_speculatively(executor: Executor, ops: List[Operator], baseline: BaselineAnalysis, wit: Witness,
+                            predicates: Dict[str, bool], full_certificates: bool, inst: Instrumentation,
+                            compiler: Optional[CompileBackend] = None):
+    """Evaluate all candidates concurrently but yield them in priority order.
+
+    As soon as any candidate is certified, every lower-priority candidate that has
+    not started yet is cancelled; its result could never be selected.
     """
-    out_dir.mkdir(parents=True, exist_ok=True)
-    src = solidity_path.read_text(encoding="utf-8")
-    wit = Witness.from_json(json.loads(witness_path.read_text(encoding="utf-8")))
+    instrumented = not isinstance(inst, NullInstrumentation)
+    compiler_spec = compiler.spec() if compiler is not None else None
+    futures = [executor.submit(_evaluate_candidate, wit.vuln_class, op.family, op.name, baseline, wit.function, predicates,
+                               full_certificates, instrumented, compiler_spec)
+               for op in ops]
+    rank = {f: i for i, f in enumerate(futures)}
+    best = len(futures)
+    pending = set(futures)
+    try:
+        for i, fut in enumerate(futures):
+            while not fut.done():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    j = rank[f]
+                    if j < best and not f.cancelled() and f.exception() is None and f.result()[2]:
+                        best = j
+                        for g in futures[j + 1:]:
+                            g.cancel()
+            if fut.cancelled():
+                return
+            *result, report = fut.result()
+            if report is not None:
+                inst.merge(report)
+            yield (ops[i], *result)
+    finally:
+        for f in futures:
+            f.cancel()
+
+@dataclass
+class RepairOutcome:
+    summary: Dict[str, Any]
+    patched: Optional[str] = None
+    certificate: Optional[Union[Certificate, CompositeCertificate]] = None
+
+def _repair_target(src: str, index: ContractIndex, wit: Witness, rcg_cache: Optional[RCGCache], executor: Optional[Executor],
+                   full_certificates: bool, inst: Instrumentation, baseline: Optional[BaselineAnalysis] = None,
+                   clone_memo: Optional[CloneMemo] = None, previous: Optional[PreviousRun] = None,
+                   compiler: Optional[CompileBackend] = None):
+    # one (function, vuln_class) target: RCG, operator selection and candidate evaluation;
+    # returns its summary entries and the accepted (operator, patched source, certificate), if any
+    fp = body_print(index, wit.function)
+    fingerprint = target_fingerprint(index, fp, wit, compiler)
+    if previous is not None:
+        prior = previous.lookup(wit, fingerprint)
+        if prior is not None:
+            with inst.stage("reuse"):
+                reused = _reuse_target(src, fp, wit, prior, compiler)
+            if reused is not None:
+                inst.count("reused")
+                return reused
 
-    rcg = build_rcg(src, wit.function)
-    fams = operator_families()
-    ops = fams.get(wit.vuln_class, [])
-    applicable_ops = [op for op in ops if op.applicable(rcg.predicates)]
+    cache_tier = None
+    with inst.stage("build_rcg"):
+        if rcg_cache is not None:
+            rcg, cache_tier = rcg_cache.build_rcg(src, wit.function, index)
+            inst.count(f"rcg_cache_{cache_tier}")
+        else:
+            rcg = build_rcg(src, wit.function, index)
+    with inst.stage("select_operators"):
+        applicable_ops = list(registry().applicable(wit.vuln_class, rcg.predicates))
 
     results = {
-        "contract": solidity_path.name,
         "function": wit.function,
         "vuln_class": wit.vuln_class,
         "predicates": rcg.predicates,
         "attempted": [],
         "accepted": None,
     }
+    if cache_tier is not None:
+        results["rcg_cache"] = cache_tier
+    results["fingerprint"] = fingerprint
 
-    for op in applicable_ops:
-        patched, meta = op.apply(src, wit.function)
-        ok, cert = check_patch(src, patched, wit.vuln_class, op.name, wit.function, rcg.predicates)
+    accepted = None
+    if baseline is None:
+        with inst.stage("baseline"):
+            baseline = BaselineAnalysis(src, index)
+    if executor is None:
+        candidates = _evaluate_serially(applicable_ops, baseline, wit, rcg.predicates, full_certificates, inst, clone_memo, fp,
+                                        compiler)
+    else:
+        candidates = _evaluate_speculatively(executor, applicable_ops, baseline, wit, rcg.predicates, full_certificates,
+                                             inst, compiler)
+    for op, patched, meta, ok, cert, clone in candidates:
+        inst.count("candidates")
         attempt = {
             "operator": op.name,
             "family": op.family,
@@ -47,14 +190,367 @@ def repair(solidity_path: Path, witness_path: Path, out_dir: Path) -> Dict[str,
             "accepted": bool(ok),
             "certificate": asdict(cert),
         }
+        if clone is not None:
+            attempt["clone"] = clone
         results["attempted"].append(attempt)
         if ok:
-            # write artifacts
-            (out_dir / "patched.sol").write_text(patched, encoding="utf-8")
-            (out_dir / "certificate.json").write_text(json.dumps(asdict(cert), indent=2), encoding="utf-8")
-            (out_dir / "diff.patch").write_text(cert.diff_unified, encoding="utf-8")
-            results["accepted"] = {"operator": op.name, "meta": meta}
+            inst.count("accepted")
+            accepted = (op, patched, cert)
+            # function-relative edits, so a later incremental run can re-anchor them
+            results["accepted"] = {"operator": op.name, "meta": meta,
+                                   "edits": relative_edits(fp, op.patch_edits(src, patched, wit.function))}
             break
+    candidates.close()
+    return results, accepted
+
+def _reuse_target(src: str, fp: BodyPrint, wit: Witness, prior: Dict[str, Any],
+                  compiler: Optional[CompileBackend] = None):
+    # an unchanged target from a previous run: take its decisions and certificate, re-anchor its patch;
+    # None if the patched file no longer compiles (compiling reads the whole file, not just the target)
+    results = copy.deepcopy(prior)
+    results.pop("rcg_cache", None)
+    results["reused"] = True
+    if results["accepted"] is None:
+        return results, None
+    attempt = results["attempted"][-1]
+    op = get_operator(attempt["family"], attempt["operator"])
+    if results["accepted"].get("edits") is not None:
+        patched = splice(src, reanchor(results["accepted"]["edits"], fp))
+    else:
+        patched, _ = op.apply(src, wit.function)  # the patch reaches outside the function
+    if compiler is not None and not compiler.check(patched)["ok"]:
+        return None
+    # the certified decisions carry over; only the diff's line numbers depend on the rest of the file
+    attempt["certificate"]["diff_unified"] = scoped_unified_diff(src, patched)
+    return results, (op, patched, Certificate(**attempt["certificate"]))
+
+def repair_source(src: str, wit: Witness, contract_name: str, rcg_cache: Optional[RCGCache] = None,
+                  executor: Optional[Executor] = None, full_certificates: bool = False,
+                  instrument: Optional[Instrumentation] = None, clone_memo: Optional[CloneMemo] = None,
+                  previous: Optional[PreviousRun] = None, compiler: Optional[CompileBackend] = None) -> RepairOutcome:
+    """In-memory core of `repair`: no file reads or writes."""
+    inst = instrument if instrument is not None else NullInstrumentation()
+    with inst.stage("index"):
+        index = ContractIndex.build(src)
+    results, accepted = _repair_target(src, index, wit, rcg_cache, executor, full_certificates, inst,
+                                       clone_memo=clone_memo, previous=previous, compiler=compiler)
+    outcome = RepairOutcome(summary={"contract": contract_name, **results})
+    if accepted is not None:
+        _, outcome.patched, outcome.certificate = accepted
+    return outcome
+
+def _overlaps(a: Edit, b: Edit) -> bool:
+    if a == b:
+        return False  # the same edit from two targets (e.g. a shared declaration) is applied once
+    if a.start == a.end and b.start == b.end:
+        return a.start == b.start
+    return a.start < b.end and b.start < a.end
+
+def repair_targets(src: str, targets: List[Witness], contract_name: str, rcg_cache: Optional[RCGCache] = None,
+                   executor: Optional[Executor] = None, full_certificates: bool = False,
+                   instrument: Optional[Instrumentation] = None, clone_memo: Optional[CloneMemo] = None,
+                   previous: Optional[PreviousRun] = None, compiler: Optional[CompileBackend] = None) -> RepairOutcome:
+    """Repair several (function, vuln_class) targets of one contract in a single pass.
+
+    The source is indexed and analysed once, and each target is repaired against the
+    original contract exactly as `repair_source` would. Accepted patches whose edits
+    do not overlap are then spliced into one patched contract, every composed target
+    is re-checked against it, and the result carries one CompositeCertificate.
+    Targets left out (overlapping edits or a failed re-check) are marked
+    "composed": false with the reason.
+    """
+    inst = instrument if instrument is not None else NullInstrumentation()
+    with inst.stage("index"):
+        index = ContractIndex.build(src)
+    with inst.stage("baseline"):
+        baseline = BaselineAnalysis(src, index)
+
+    entries = []
+    accepted = []
+    for wit in targets:
+        results, acc = _repair_target(src, index, wit, rcg_cache, executor, full_certificates, inst, baseline,
+                                      clone_memo, previous, compiler)
+        entries.append(results)
+        if acc is not None:
+            accepted.append((results, wit, *acc))
+
+    with inst.stage("compose"):
+        composed = []
+        owners: List[Tuple[Edit, str]] = []
+        for results, wit, op, patched, cert in accepted:
+            edits = op.patch_edits(src, patched, wit.function)
+            clash = next((fn for e in edits for other, fn in owners if _overlaps(e, other)), None)
+            if clash is not None:
+                results["composed"] = False
+                results["conflict"] = f"edits overlap the patch for '{clash}'"
+                continue
+            owners += [(e, wit.function) for e in edits]
+            composed.append((results, wit, op, cert, edits))
+
+        # re-check every composed target against the combined contract; drop failures until stable
+        patched, certs = src, []
+        while composed:
+            patched = splice(src, dict.fromkeys(e for *_, edits in composed for e in edits))
+            checks = [check_patch(src, patched, wit.vuln_class, op.name, wit.function, cert.predicates,
+                                  lazy=True, baseline=baseline, compiler=compiler)
+                      for _, wit, op, cert, _ in composed]
+            if all(ok for ok, _ in checks):
+                certs = [pending.materialize(include_diff=False) for _, pending in checks]
+                break
+            kept = []
+            for entry, (ok, pending) in zip(composed, checks):
+                if ok:
+                    kept.append(entry)
+                else:
+                    entry[0]["composed"] = False
+                    entry[0]["conflict"] = f"fails re-check in the composed contract: {pending.notes}"
+            composed = kept
+        for results, *_ in composed:
+            results["composed"] = True
+
+    summary = {
+        "contract": contract_name,
+        "targets": entries,
+        "accepted": [
+            {"function": wit.function, "vuln_class": wit.vuln_class, "operator": op.name,
+             "meta": results["accepted"]["meta"]}
+            for results, wit, op, _, _ in composed
+        ],
+    }
+    outcome = RepairOutcome(summary=summary)
+    if composed:
+        with inst.stage("certificate"):
+            left_out = len(accepted) - len(composed)
+            outcome.patched = patched
+            outcome.certificate = CompositeCertificate(
+                diff_unified=scoped_unified_diff(src, patched),
+                targets=certs,
+                notes="ok" if not left_out else f"{left_out} accepted target(s) not composed; see run_summary.json",
+            )
+    return outcome
+
+def repair_witness(src: str, witness: Dict[str, Any], contract_name: str, **kwargs: Any) -> RepairOutcome:
+    """`repair_targets` for a multi-target witness object, `repair_source` otherwise."""
+    if "targets" in witness:
+        return repair_targets(src, Witness.targets_from_json(witness), contract_name, **kwargs)
+    return repair_source(src, Witness.from_json(witness), contract_name, **kwargs)
+
+def _artifact_texts(outcome: RepairOutcome) -> Dict[str, str]:
+    if outcome.certificate is None:
+        return {}
+    return {
+        "patched.sol": outcome.patched,
+        "certificate.json": json.dumps(asdict(outcome.certificate), indent=2),
+        "diff.patch": outcome.certificate.diff_unified,
+    }
+
+def _write_artifacts(outcome: RepairOutcome, out_dir: Path) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, text in _artifact_texts(outcome).items():
+        (out_dir / name).write_text(text, encoding="utf-8")
+
+def write_outcome(outcome: RepairOutcome, out_dir: Path) -> None:
+    _write_artifacts(outcome, out_dir)
+    (out_dir / "run_summary.json").write_text(json.dumps(outcome.summary, indent=2), encoding="utf-8")
+
+def repair(solidity_path: Path, witness_path: Path, out_dir: Optional[Path], rcg_cache: Optional[RCGCache] = None,
+           executor: Optional[Executor] = None, full_certificates: bool = False,
+           instrument: Optional[Instrumentation] = None, clone_memo: Optional[CloneMemo] = None,
+           incremental: bool = False, previous: Optional[PreviousRun] = None,
+           collect: Optional[Dict[str, str]] = None, compiler: Optional[CompileBackend] = None) -> Dict[str, Any]:
+    """Run a lightweight SafePrompt-style detection-to-repair pass.
+
+    Inputs are intentionally simple for artifact reproducibility:
+    - solidity_path: path to the contract
+    - witness_path: JSON with vuln_class + function (+ optional hints), or a
+      multi-target witness {"targets": [...]} (see `repair_targets`)
+    Outputs:
+    - patched contract, certificate JSON, unified diff
+    With an `rcg_cache`, the RCG is looked up before being built and the summary
+    records which cache tier served it. With an `executor`, applicable operators are
+    evaluated speculatively in parallel; the accepted operator and the "attempted"
+    record are the same as in the serial run. Certificates of rejected candidates
+    carry no diff ("diff_unified": null) unless `full_certificates` is set.
+    An `instrument` times each stage and operator and hands the report to its
+    sinks before run_summary.json is written. A `clone_memo` reuses certified edits
+    of identical function bodies seen before (serial evaluation only); each attempt
+    then records its "clone" hit kind. With `incremental`, the run_summary.json
+    already in `out_dir` is taken as the previous run: targets whose span and
+    dependency hashes ("fingerprint") are unchanged reuse its decisions and
+    certificate ("reused": true) instead of being analysed again; `previous` passes
+    that earlier run explicitly. With a `collect` dict nothing is written: the texts
+    of the artifacts and of run_summary.json are stored in it by file name (this is
+    how batch runs feed a `store.ResultStore`), and `out_dir` may be None.
+    A `compiler` backend (see `cert.compiler`) turns the compile placeholder into a
+    real compile check of every candidate; results are cached by source hash.
+    """
+    if collect is None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if incremental and previous is None:
+            previous = PreviousRun.load(out_dir / "run_summary.json")
+    inst = instrument if instrument is not None else NullInstrumentation()
+    inst.start()
+    try:
+        with inst.stage("read_inputs"):
+            src = read_source(solidity_path)
+            witness = json.loads(witness_path.read_text(encoding="utf-8"))
+        outcome = repair_witness(src, witness, solidity_path.name, rcg_cache=rcg_cache, executor=executor,
+                                 full_certificates=full_certificates, instrument=inst, clone_memo=clone_memo,
+                                 previous=previous, compiler=compiler)
+        with inst.stage("write_outputs"):
+            if collect is None:
+                _write_artifacts(outcome, out_dir)
+            else:
+                collect.update(_artifact_texts(outcome))
+    finally:
+        inst.stop()
+    inst.emit(outcome.summary)
+    summary_text = json.dumps(outcome.summary, indent=2)
+    if collect is None:
+        (out_dir / "run_summary.json").write_text(summary_text, encoding="utf-8")
+    else:
+        collect["run_summary.json"] = summary_text
+    return outcome.summary
+
+@dataclass(frozen=True)
+class RepairJob:
+    contract: Path
+    witness: Path
+    out_dir: Path
+
+def _job_out_dir(contract: Path, witness: Path, base: Path, out_root: Path) -> Path:
+    # mirror the input layout so that equally named contracts in different folders do not collide
+    try:
+        rel = contract.resolve().relative_to(base.resolve()).with_suffix("")
+    except ValueError:
+        rel = Path(contract.stem)
+    return out_root / rel if witness.stem == contract.stem else out_root / rel / witness.stem
 
-    (out_dir / "run_summary.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+def load_jobs(source: Path, out_root: Path) -> List[RepairJob]:
+    """Collect (contract, witness) pairs from a manifest file or a directory.
+
+    - manifest (.json list or .jsonl): entries with "contract", "witness" and an
+      optional "out"; relative paths are resolved against the manifest's folder.
+    - directory: every *.sol below it, paired with a sibling <stem>.json witness.
+    """
+    jobs: List[RepairJob] = []
+    if source.is_dir():
+        for contract in sorted(source.rglob("*.sol")):
+            witness = contract.with_suffix(".json")
+            if not witness.exists():
+                continue
+            jobs.append(RepairJob(contract, witness, _job_out_dir(contract, witness, source, out_root)))
+        return jobs
+
+    base = source.parent
+    text = source.read_text(encoding="utf-8")
+    if source.suffix == ".jsonl":
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        entries = json.loads(text)
+    for entry in entries:
+        contract = base / entry["contract"]
+        witness = base / entry["witness"]
+        out_dir = out_root / entry["out"] if entry.get("out") else _job_out_dir(contract, witness, base, out_root)
+        jobs.append(RepairJob(contract, witness, out_dir))
+    return jobs
+
+_WORKER_CACHES: Dict[Tuple[type, str], Any] = {}
+
+def _worker_cache(cache_dir: Optional[str], cls: type = RCGCache) -> Any:
+    # one cache (or memo) per worker process, shared by every job that process runs
+    if cache_dir is None:
+        return None
+    if (cls, cache_dir) not in _WORKER_CACHES:
+        _WORKER_CACHES[cls, cache_dir] = cls(Path(cache_dir))
+    return _WORKER_CACHES[cls, cache_dir]
+
+def run_key(out_dir: Path, root: Union[str, Path]) -> str:
+    """Key of a run: its output folder relative to `root`, with forward slashes (the same on every machine)."""
+    return Path(os.path.relpath(out_dir, root)).as_posix()
+
+def _run_job(job: RepairJob, cache_dir: Optional[str] = None, timings: bool = False,
+             memo_dir: Optional[str] = None, incremental: bool = False,
+             store: Optional[Tuple[str, str]] = None,
+             compiler_spec: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+    inst = Instrumentation(sinks=[SummarySink()]) if timings else None
+    collect = previous = None
+    if store is not None:
+        # the parent writes to the store; hand the artifacts back instead of writing files
+        collect = {}
+        if incremental:
+            from .store import ResultStore
+            prior = _worker_cache(store[0], ResultStore).summary(run_key(job.out_dir, store[1]))
+            previous = PreviousRun(prior) if prior is not None else None
+    try:
+        results = repair(job.contract, job.witness, job.out_dir, rcg_cache=_worker_cache(cache_dir), instrument=inst,
+                         clone_memo=_worker_cache(memo_dir, CloneMemo), incremental=incremental, previous=previous,
+                         collect=collect, compiler=backend_from_spec(compiler_spec))
+    except Exception as e:  # one malformed input must not abort the whole batch
+        results = {"contract": job.contract.name, "error": f"{type(e).__name__}: {e}"}
+        if collect is not None:
+            # the store keeps failures too, as a run with only its summary
+            collect = {"run_summary.json": json.dumps(results, indent=2)}
+    results["job"] = {"contract": str(job.contract), "witness": str(job.witness), "out_dir": str(job.out_dir)}
+    if collect:
+        results["artifacts"] = collect
+        try:
+            results["contract_sha256"] = sha256_file(job.contract)
+        except OSError:
+            results["contract_sha256"] = None
     return results
+
+def repair_many(jobs: Iterable[RepairJob], workers: Optional[int] = None, chunksize: Optional[int] = None,
+                ordered: bool = True, rcg_cache_dir: Optional[Path] = None,
+                timings: bool = False, clone_memo_dir: Optional[Path] = None,
+                incremental: bool = False, store: Optional[ResultStore] = None,
+                store_root: Optional[Path] = None,
+                compiler: Optional[CompileBackend] = None) -> Iterator[Dict[str, Any]]:
+    """Run `repair` over many jobs on a process pool.
+
+    Results are yielded in job order when `ordered` is set, otherwise as soon as
+    they complete. Each result carries a "job" entry identifying its inputs;
+    failures are reported with an "error" entry instead of raising.
+    `rcg_cache_dir` enables an RCG cache per worker on a shared disk tier.
+    With `timings`, every run summary gets a "timings" section (see `instrument`).
+    `clone_memo_dir` enables a CloneMemo per worker on a shared disk tier.
+    `incremental` re-repairs each job against the summary already in its output folder.
+    With a `store`, no files are written: each run goes into the ResultStore under
+    its output folder relative to `store_root`, and `ResultStore.export` recreates
+    the folders later. A `compiler` backend is rebuilt once in every worker process
+    from its spec; give it a `cache_dir` to share compile results between them.
+    """
+    jobs = list(jobs)
+    store_args = (str(store.path), str(store_root)) if store is not None else None
+    run_job = partial(_run_job, cache_dir=str(rcg_cache_dir) if rcg_cache_dir is not None else None, timings=timings,
+                      memo_dir=str(clone_memo_dir) if clone_memo_dir is not None else None, incremental=incremental,
+                      store=store_args, compiler_spec=compiler.spec() if compiler is not None else None)
+    if store is not None:
+        yield from _into_store(_run_jobs(run_job, jobs, workers, chunksize, ordered), store, str(store_root))
+    else:
+        yield from _run_jobs(run_job, jobs, workers, chunksize, ordered)
+
+def _into_store(results: Iterator[Dict[str, Any]], store: ResultStore, root: str) -> Iterator[Dict[str, Any]]:
+    for result in results:
+        files = result.pop("artifacts", None)
+        digest = result.pop("contract_sha256", None)
+        if files is not None:
+            store.add(run_key(Path(result["job"]["out_dir"]), root), files, digest, result["job"])
+        yield result
+    store.flush()
+
+def _run_jobs(run_job, jobs: List[RepairJob], workers: Optional[int], chunksize: Optional[int],
+              ordered: bool) -> Iterator[Dict[str, Any]]:
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield run_job(job)
+        return
+    if chunksize is None:
+        # same heuristic as Pool.map: a few chunks per worker keeps the pool busy without much IPC
+        chunksize = max(1, len(jobs) // (workers * 4))
+
+    import multiprocessing
+    with multiprocessing.Pool(processes=min(workers, len(jobs))) as pool:
+        run = pool.imap if ordered else pool.imap_unordered
+        yield from run(run_job, jobs, chunksize)
@@ -1,11 +1,45 @@
 
 from __future__ import annotations
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
+
+from .index import ContractIndex
+
+# Bump whenever node/predicate heuristics change; cached RCGs are keyed on it.
+ANALYSER_VERSION = "1"
+
+# Predicate names in bit order; operator dispatch and compact RCGs encode predicates as bitmasks.
+# The last two are inter-procedural (see callgraph.py); new names go at the end so bits stay put.
+PREDICATES = ("has_external_call", "has_state_write", "has_require_guard",
+              "external_call_in_callee", "shared_state_read_elsewhere")
 
 EXTERNAL_CALL_RE = re.compile(r'\.(call|delegatecall|staticcall)\b|\btransfer\(|\bsend\(')
 
+# Per-line heuristics, as one alternation scanned over the function span:
+#   ext      an external call site (EXTERNAL_CALL_RE)
+#   guard    a require(/assert( guard
+#   veto     rules a line out as a state write: comparisons and memory/calldata declarations
+#   comment  "//"; vetoes the line only when nothing but whitespace precedes it
+#   assign   an "=" followed by something on the same line
+#   tail     an "=" that ends the line; only a compound `x +=` / `x[i] -=` counts then
+# The leading lookahead rejects most positions on their first character.
+_CLASSIFY_RE = re.compile(r'''
+  (?=[.tsramc=/])
+  (?:
+    (?P<ext>\.(?:call|delegatecall|staticcall)\b|\btransfer\(|\bsend\()
+  | (?P<guard>require\(|assert\()
+  | (?P<veto>==|memory|calldata)
+  | (?P<comment>//)
+  | (?P<assign>=(?=[^\s=]|[^\S\n]+\S))
+  | (?P<tail>=)
+  )
+''', re.VERBOSE)
+_COMPOUND_ASSIGN_RE = re.compile(r'\b\w+\s*(\[.*?\])?\s*\+=|\b\w+\s*(\[.*?\])?\s*-=')
+_EXT, _GUARD, _VETO, _ASSIGN, _TAIL = 1, 2, 4, 8, 16
+_FLAG = {"ext": _EXT, "guard": _GUARD, "veto": _VETO, "comment": 0, "assign": _ASSIGN, "tail": _TAIL}
+
 @dataclass
 class RCGNode:
     kind: str
@@ -20,86 +54,79 @@ class RepairContextGraph:
     edges: List[Tuple[int, int]]
     predicates: Dict[str, bool]
 
-def _find_contract_name(src: str) -> str:
-    m = re.search(r'\bcontract\s+(\w+)\b', src)
-    return m.group(1) if m else "UnknownContract"
-
-def _extract_function_block(src_lines: List[str], fn_name: str) -> Tuple[int, int]:
-    # naive brace matching starting at function signature line
-    start = None
-    for i, line in enumerate(src_lines, start=1):
-        if re.search(rf'\bfunction\s+{re.escape(fn_name)}\b', line):
-            start = i
-            break
-    if start is None:
-        raise ValueError(f"function '{fn_name}' not found")
-    brace = 0
-    began = False
-    for j in range(start, len(src_lines) + 1):
-        line = src_lines[j-1]
-        for ch in line:
-            if ch == '{':
-                brace += 1
-                began = True
-            elif ch == '}':
-                brace -= 1
-        if began and brace == 0:
-            return start, j
-    return start, len(src_lines)
-
-def build_rcg(solidity_source: str, fn_name: str) -> RepairContextGraph:
+def build_rcg(solidity_source: str, fn_name: str, index: Optional[ContractIndex] = None,
+              interprocedural: bool = True) -> RepairContextGraph:
     """Build a lightweight Repair Context Graph (RCG).
 
     This implementation is deliberately conservative and deterministic:
     it captures (a) external call sites and (b) state writes in the same function.
     Predicates are simple boolean flags used for operator applicability.
+    Pass a prebuilt `index` when analysing several functions of the same file.
+    Inter-procedural predicates come from the index's call graph, built once per
+    file; `interprocedural=False` leaves them out (what the RCG cache stores, since
+    they depend on code outside the function).
     """
-    lines = solidity_source.splitlines()
-    contract = _find_contract_name(solidity_source)
-    start, end = _extract_function_block(lines, fn_name)
+    if index is None:
+        index = ContractIndex.build(solidity_source)
+    fn = index.function(fn_name)
+    contract = index.contract_name(fn)
+    start, end = fn.start_line, fn.end_line
 
     nodes: List[RCGNode] = []
     edges: List[Tuple[int,int]] = []
-    last_node_idx = None
+
+    # classify the whole span in one scan, then decide per line
+    span_start = index.line_offsets[start - 1]
+    span_end = index.line_offsets[end] - 1 if end < len(index.line_offsets) else len(solidity_source)
+    offsets = index.line_offsets
+    line_flags: Dict[int, int] = {}
+    for m in _CLASSIFY_RE.finditer(solidity_source, span_start, span_end):
+        pos = m.start()
+        ln = bisect_right(offsets, pos)
+        flag = _FLAG[m.lastgroup]
+        if not flag and not solidity_source[offsets[ln - 1]:pos].strip():
+            flag = _VETO  # comment line
+        line_flags[ln] = line_flags.get(ln, 0) | flag
 
     has_external_call = False
     has_state_write = False
     has_require_guard = False
 
-    for ln in range(start, end + 1):
-        text = lines[ln-1]
-        stripped = text.strip()
-
-        if "require(" in stripped or "assert(" in stripped:
+    for ln, flags in line_flags.items():
+        if flags & _GUARD:
             has_require_guard = True
-
-        if EXTERNAL_CALL_RE.search(stripped):
+        if flags & _EXT:
             has_external_call = True
-            nodes.append(RCGNode(kind="external_call", line=ln, text=stripped))
-            if last_node_idx is not None:
-                edges.append((last_node_idx, len(nodes)-1))
-            last_node_idx = len(nodes)-1
+            kind = "external_call"
+        elif flags & _VETO:
             continue
-
-        # heuristic state write: assignment to mapping or storage var
-        if re.search(r'\b\w+\s*(\[.*?\])?\s*\+=|\b\w+\s*(\[.*?\])?\s*-=', stripped) or re.search(r'=\s*[^=]', stripped):
-            # filter out local declarations to reduce noise
-            if "memory" not in stripped and "calldata" not in stripped and not stripped.startswith("//") and "==" not in stripped:
-                has_state_write = True
-                nodes.append(RCGNode(kind="state_write", line=ln, text=stripped))
-                if last_node_idx is not None:
-                    edges.append((last_node_idx, len(nodes)-1))
-                last_node_idx = len(nodes)-1
+        elif flags & _ASSIGN or (flags & _TAIL and _COMPOUND_ASSIGN_RE.search(index.line_text(ln).strip())):
+            # heuristic state write: assignment to mapping or storage var
+            has_state_write = True
+            kind = "state_write"
+        else:
+            continue
+        nodes.append(RCGNode(kind=kind, line=ln, text=index.line_text(ln).strip()))
+        if len(nodes) > 1:
+            edges.append((len(nodes) - 2, len(nodes) - 1))
 
     predicates = {
         "has_external_call": has_external_call,
         "has_state_write": has_state_write,
         "has_require_guard": has_require_guard,
     }
-    return RepairContextGraph(
+    rcg = RepairContextGraph(
         contract_name=contract,
         function=fn_name,
         nodes=nodes,
         edges=edges,
         predicates=predicates,
     )
+    if interprocedural:
+        add_interprocedural(rcg, index)
+    return rcg
+
+def add_interprocedural(rcg: RepairContextGraph, index: ContractIndex) -> RepairContextGraph:
+    """Merge the call-graph predicates of `rcg.function` into `rcg.predicates`."""
+    rcg.predicates.update(index.call_graph().predicates(rcg.function))
+    return rcg
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .build_rcg import ANALYSER_VERSION, RepairContextGraph, add_interprocedural, build_rcg
+from .compact import CompactRCG
+from .index import ContractIndex
+
+class TieredStore:
+    """JSON payloads by key, with an in-memory LRU tier and an optional size-bounded on-disk tier.
+
+    The disk tier may be shared by several processes: entries are written atomically
+    and the least recently used ones (by mtime) are evicted past `max_bytes`.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_writes": 0, "disk_evictions": 0}
+        self._disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.json"))
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        payload = self._memory.get(key)
+        if payload is not None:
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            return payload, "memory"
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)  # mtime doubles as the disk tier's LRU clock
+            except (OSError, ValueError):
+                payload = None
+            if payload is not None:
+                self._counters["disk_hits"] += 1
+                self._remember(key, payload)
+                return payload, "disk"
+        self._counters["misses"] += 1
+        return None, "miss"
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        self._remember(key, payload)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # atomic, so concurrent workers never see a torn entry
+        self._counters["disk_writes"] += 1
+        self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        # other processes may share the directory, so recount from disk before evicting
+        entries = []
+        for p in self.directory.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort(key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            self._counters["disk_evictions"] += 1
+        self._disk_bytes = total
+
+# bumped when the layout of RCGCache entries changes, so older entries are not read
+PAYLOAD_VERSION = 2
+
+class RCGCache(TieredStore):
+    """Content-addressed RCG cache with an in-memory LRU tier and an optional on-disk tier.
+
+    Entries are keyed by the analyser version and the text of the lines spanned by the
+    function, and store the RCG in CompactRCG form relative to the function start, so
+    an unchanged function hits even when the code around it moves. Node texts are
+    offsets into that span rather than copies, since the key pins its text. Only the
+    function's own analysis is cached; inter-procedural predicates are merged in after
+    the lookup.
+    """
+
+    @staticmethod
+    def key(index: ContractIndex, fn_name: str) -> str:
+        fn = index.function(fn_name)
+        start = index.line_offsets[fn.start_line - 1]
+        end = index.line_offsets[fn.end_line] if fn.end_line < len(index.line_offsets) else len(index.source)
+        h = hashlib.sha256()
+        for part in (ANALYSER_VERSION, str(PAYLOAD_VERSION), fn_name):
+            h.update(part.encode("utf-8") + b"\0")
+        h.update(index.source[start:end].encode("utf-8"))
+        return h.hexdigest()
+
+    def build_rcg(self, src: str, fn_name: str, index: Optional[ContractIndex] = None) -> Tuple[RepairContextGraph, str]:
+        """Return the RCG of `fn_name` and the tier it came from ("memory", "disk" or "miss")."""
+        if index is None:
+            index = ContractIndex.build(src)
+        fn = index.function(fn_name)
+        key = self.key(index, fn_name)
+        span_start = index.line_offsets[fn.start_line - 1]
+        payload, tier = self.get(key)
+        if payload is None:
+            rcg = build_rcg(src, fn_name, index, interprocedural=False)
+            self.put(key, CompactRCG.from_rcg(rcg, src, index).to_payload(span_start, fn.start_line))
+            return add_interprocedural(rcg, index), tier
+        compact = CompactRCG.from_payload(payload, src, span_start, fn.start_line, index.contract_name(fn), fn_name)
+        return add_interprocedural(compact.to_rcg(), index), tier
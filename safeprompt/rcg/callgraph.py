@@ -0,0 +1,201 @@
+from __future__ import annotations
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from .index import ContractIndex, FunctionSpan
+
+# Contract-wide facts for inter-procedural predicates: per function, the functions it
+# calls, the state variables it reads and writes, and its external call sites. Built
+# once per ContractIndex (see `ContractIndex.call_graph`) and shared by every target,
+# so a predicate is a lookup instead of a re-scan of the callees.
+
+INTERPROCEDURAL_PREDICATES = ("external_call_in_callee", "shared_state_read_elsewhere")
+
+# contract-level declarations (between function bodies) that introduce a state variable
+_STATE_VAR_RE = re.compile(r'''
+  ^[^\S\n]*
+  (?:mapping\s*\([^;]*\)|[A-Za-z_][\w.]*(?:\s*\[[^\]\n]*\])*)       # type
+  (?:\s+(?:public|private|internal|constant|immutable|override|transient|payable))*
+  \s+(?P<name>[A-Za-z_]\w*)
+  \s*(?:=[^;]*)?;
+''', re.VERBOSE | re.MULTILINE)
+_NOT_TYPES = {"return", "emit", "using", "import", "pragma", "event", "error", "delete", "revert", "break", "continue"}
+
+_SKIP = r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)|" + r'"(?:\\.|[^"\\\n])*"' + "|" + r"'(?:\\.|[^'\\\n])*'"
+_BRACE_RE = re.compile(rf'(?P<skip>{_SKIP})|[{{}}]')
+_EXT = r'''\.(?:call|delegatecall|staticcall)\b|\btransfer\(|\bsend\('''
+# after a state variable: optional index/member accesses, then an assignment or ++/--
+_WRITE_AFTER_RE = re.compile(r'(?:\s*\[[^\]\n]*\]|\s*\.\w+)*\s*(?:(?:[-+*/%|&^]|<<|>>)?=(?!=)|\+\+|--)')
+_WRITE_BEFORE_RE = re.compile(r'(?:\+\+|--|\bdelete\s+)$')
+
+@dataclass
+class FunctionFacts:
+    calls: List[str] = field(default_factory=list)          # functions of this file called by name, first call first
+    reads: Set[str] = field(default_factory=set)
+    writes: Set[str] = field(default_factory=set)
+    external_calls: List[int] = field(default_factory=list)  # offsets of external call sites
+
+@dataclass
+class CallGraphIndex:
+    """Calls, storage reads/writes and external call sites of every function in a file."""
+    index: ContractIndex = field(repr=False)
+    state_vars: FrozenSet[str] = frozenset()
+    facts: Dict[int, FunctionFacts] = field(default_factory=dict, repr=False)   # by FunctionSpan.start
+    _reach: Dict[int, FrozenSet[int]] = field(default_factory=dict, repr=False)
+    _effective_cache: Dict[tuple, FrozenSet[str]] = field(default_factory=dict, repr=False)
+    _readers: Optional[Dict[str, List[FunctionSpan]]] = field(default=None, repr=False)
+    _predicates: Dict[str, Dict[str, bool]] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def build(index: ContractIndex) -> "CallGraphIndex":
+        src = index.source
+        bodies = [fn for fn in index.functions if fn.has_body]
+
+        # state variables: declarations directly in a contract body, outside functions, structs and modifiers
+        names: Set[str] = set()
+        for c in index.contracts:
+            pos, depth = c.start, 0
+            for fn in bodies:
+                if fn.end <= c.start or fn.start >= c.end:
+                    continue
+                depth = _declared(src, pos, fn.start, depth, names)
+                pos = max(pos, fn.end)
+            _declared(src, pos, c.end, depth, names)
+
+        cg = CallGraphIndex(index=index, state_vars=frozenset(names))
+        cg.facts = {fn.start: FunctionFacts() for fn in bodies}
+        if not bodies:
+            return cg
+
+        parts = [rf'(?P<skip>{_SKIP})', rf'(?P<ext>{_EXT})']
+        if names:
+            parts.append(r'(?P<var>(?<![.\w])(?:%s)\b)' % "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True)))
+        parts.append(r'(?P<call>(?<![.\w])[A-Za-z_]\w*(?=\s*\())')
+        scan = re.compile("|".join(parts))
+
+        # one scan over the file; each match belongs to the function body around it
+        starts = [fn.body_start for fn in bodies]
+        known = {fn.name for fn in index.functions}
+        for m in scan.finditer(src, bodies[0].body_start, max(fn.end for fn in bodies)):
+            kind = m.lastgroup
+            if kind == "skip":
+                continue
+            pos = m.start()
+            i = bisect_right(starts, pos) - 1
+            if i < 0 or bodies[i].end <= pos:
+                continue  # between functions (bodies do not nest)
+            facts = cg.facts[bodies[i].start]
+            if kind == "ext":
+                facts.external_calls.append(pos)
+            elif kind == "var":
+                name = m.group("var")
+                if _WRITE_AFTER_RE.match(src, m.end()) or _WRITE_BEFORE_RE.search(src, max(0, pos - 16), pos):
+                    facts.writes.add(name)
+                else:
+                    facts.reads.add(name)
+            else:
+                name = m.group("call")
+                if name in known and name != bodies[i].name and name not in facts.calls:
+                    facts.calls.append(name)
+        return cg
+
+    def of(self, fn_name: str) -> FunctionFacts:
+        return self._facts(self.index.function(fn_name))
+
+    def _facts(self, fn: FunctionSpan) -> FunctionFacts:
+        return self.facts.get(fn.start, _NO_FACTS)
+
+    def _reachable(self, root: FunctionSpan) -> FrozenSet[int]:
+        if root.start not in self._reach:
+            seen: Set[int] = set()
+            todo = [root]
+            while todo:
+                for name in self._facts(todo.pop()).calls:
+                    callee = self.index.function(name)
+                    if callee.start not in seen and callee.start != root.start:
+                        seen.add(callee.start)
+                        todo.append(callee)
+            self._reach[root.start] = frozenset(seen)
+        return self._reach[root.start]
+
+    def reachable(self, fn_name: str) -> List[FunctionSpan]:
+        """Functions called by `fn_name`, directly or through other functions (excluding itself)."""
+        spans = {fn.start: fn for fn in self.index.functions}
+        return [spans[start] for start in sorted(self._reachable(self.index.function(fn_name)))]
+
+    def external_helpers(self, fn_name: str) -> List[str]:
+        """Functions reachable from `fn_name` that make an external call themselves."""
+        return [fn.name for fn in self.reachable(fn_name) if self._facts(fn).external_calls]
+
+    def _effective(self, fn: FunctionSpan, attr: str) -> FrozenSet[str]:
+        key = (fn.start, attr)
+        if key not in self._effective_cache:
+            out = set(getattr(self._facts(fn), attr))
+            for start in self._reachable(fn):
+                out |= getattr(self.facts.get(start, _NO_FACTS), attr)
+            self._effective_cache[key] = frozenset(out)
+        return self._effective_cache[key]
+
+    def _readers_by_var(self) -> Dict[str, List[FunctionSpan]]:
+        # public/external functions reading each state variable, themselves or through callees; built once
+        if self._readers is None:
+            self._readers = {}
+            for fn in self.index.functions:
+                if fn.has_body and fn.visibility in ("public", "external"):
+                    for var in self._effective(fn, "reads"):
+                        self._readers.setdefault(var, []).append(fn)
+        return self._readers
+
+    def effective(self, fn_name: str, attr: str) -> Set[str]:
+        """State variables read ("reads") or written ("writes") by `fn_name` or anything it calls."""
+        return set(self._effective(self.index.function(fn_name), attr))
+
+    def readers_of(self, fn_name: str) -> List[str]:
+        """Other public/external functions that read state `fn_name` writes (read-only reentrancy surface)."""
+        target = self.index.function(fn_name)
+        readers = self._readers_by_var()
+        found = {fn.start: fn for var in self._effective(target, "writes") for fn in readers.get(var, ())
+                 if fn.start != target.start}
+        return list(dict.fromkeys(found[start].name for start in sorted(found)))
+
+    def _has_other_reader(self, target: FunctionSpan) -> bool:
+        readers = self._readers_by_var()
+        return any(fn.start != target.start for var in self._effective(target, "writes") for fn in readers.get(var, ()))
+
+    def predicates(self, fn_name: str) -> Dict[str, bool]:
+        """The INTERPROCEDURAL_PREDICATES of `fn_name`."""
+        if fn_name not in self._predicates:
+            self._predicates[fn_name] = {
+                "external_call_in_callee": any(self.facts.get(start, _NO_FACTS).external_calls
+                                               for start in self._reachable(self.index.function(fn_name))),
+                "shared_state_read_elsewhere": self._has_other_reader(self.index.function(fn_name)),
+            }
+        return self._predicates[fn_name]
+
+_NO_FACTS = FunctionFacts()
+
+def _declared(src: str, start: int, end: int, depth: int, names: Set[str]) -> int:
+    # adds the state variables declared at contract level (brace depth 1) in [start, end); returns the depth at `end`
+    segments = []
+    seg = start
+    for m in _BRACE_RE.finditer(src, start, end):
+        tok = m.group(0)
+        if m.lastgroup == "skip":
+            continue
+        if tok == "{":
+            if depth == 1:
+                segments.append((seg, m.start()))
+            depth += 1
+        else:
+            depth -= 1
+        if depth == 1:
+            seg = m.end()
+    if depth == 1:
+        segments.append((seg, end))
+    for a, b in segments:
+        for m in _STATE_VAR_RE.finditer(src, a, b):
+            if m.group(0).split(None, 1)[0] not in _NOT_TYPES:
+                names.add(m.group("name"))
+    return depth
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from array import array
+from typing import Any, Dict, List, Optional
+
+from .build_rcg import PREDICATES, RCGNode, RepairContextGraph
+from .index import ContractIndex
+
+# Interned code tables; unseen kinds/predicates are appended so codes stay stable within a process.
+# The built-in entries come first and never move, so their codes are also valid on disk (see RCGCache).
+NODE_KINDS: List[str] = ["external_call", "state_write"]
+PREDICATE_NAMES: List[str] = list(PREDICATES)
+
+def _code(table: List[str], name: str) -> int:
+    try:
+        return table.index(name)
+    except ValueError:
+        table.append(name)
+        return len(table) - 1
+
+class CompactRCG:
+    """Memory-lean RepairContextGraph for holding many RCGs at once.
+
+    Nodes are parallel arrays (kind code, line, text offsets into the shared source
+    string), edges are a flat integer array of (src, dst) pairs, and predicates are two
+    bitsets over PREDICATE_NAMES: which predicates are present and which are true.
+    The source string is referenced, not copied, so RCGs of one file share it.
+    """
+    __slots__ = ("contract_name", "function", "source", "kinds", "lines", "starts", "ends", "edges",
+                 "predicate_keys", "predicate_bits")
+
+    def __init__(self, contract_name: str, function: str, source: str, kinds: array, lines: array,
+                 starts: array, ends: array, edges: array, predicate_keys: int, predicate_bits: int):
+        self.contract_name = contract_name
+        self.function = function
+        self.source = source
+        self.kinds = kinds
+        self.lines = lines
+        self.starts = starts
+        self.ends = ends
+        self.edges = edges
+        self.predicate_keys = predicate_keys
+        self.predicate_bits = predicate_bits
+
+    @staticmethod
+    def from_rcg(rcg: RepairContextGraph, source: str, index: Optional[ContractIndex] = None) -> "CompactRCG":
+        if index is None:
+            index = ContractIndex.build(source)
+        kinds, lines, starts, ends = array("B"), array("I"), array("I"), array("I")
+        for node in rcg.nodes:
+            text = index.line_text(node.line)
+            start = index.line_offsets[node.line - 1] + len(text) - len(text.lstrip())
+            end = start + len(node.text)
+            if source[start:end] != node.text:
+                raise ValueError(f"RCG node at line {node.line} does not match the given source")
+            kinds.append(_code(NODE_KINDS, node.kind))
+            lines.append(node.line)
+            starts.append(start)
+            ends.append(end)
+        edges = array("I")
+        for a, b in rcg.edges:
+            edges.append(a)
+            edges.append(b)
+        keys = bits = 0
+        for name, value in rcg.predicates.items():
+            bit = 1 << _code(PREDICATE_NAMES, name)
+            keys |= bit
+            if value:
+                bits |= bit
+        return CompactRCG(rcg.contract_name, rcg.function, source, kinds, lines, starts, ends, edges, keys, bits)
+
+    def to_payload(self, span_start: int, first_line: int) -> Dict[str, Any]:
+        """JSON form relative to the function's span: lines from `first_line`, text offsets from `span_start`.
+
+        The text itself is not stored; any source with the same span text can take it back.
+        """
+        return {
+            "kinds": list(self.kinds),
+            "lines": [ln - first_line for ln in self.lines],
+            "starts": [s - span_start for s in self.starts],
+            "ends": [e - span_start for e in self.ends],
+            "edges": list(self.edges),
+            "predicate_keys": self.predicate_keys,
+            "predicate_bits": self.predicate_bits,
+        }
+
+    @staticmethod
+    def from_payload(payload: Dict[str, Any], source: str, span_start: int, first_line: int, contract_name: str,
+                     function: str) -> "CompactRCG":
+        return CompactRCG(contract_name, function, source, array("B", payload["kinds"]),
+                          array("I", (first_line + ln for ln in payload["lines"])),
+                          array("I", (span_start + s for s in payload["starts"])),
+                          array("I", (span_start + e for e in payload["ends"])),
+                          array("I", payload["edges"]), payload["predicate_keys"], payload["predicate_bits"])
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def predicates(self) -> Dict[str, bool]:
+        return {name: bool(self.predicate_bits >> i & 1)
+                for i, name in enumerate(PREDICATE_NAMES) if self.predicate_keys >> i & 1}
+
+    def node_text(self, i: int) -> str:
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def to_rcg(self) -> RepairContextGraph:
+        return RepairContextGraph(
+            contract_name=self.contract_name,
+            function=self.function,
+            nodes=[RCGNode(kind=NODE_KINDS[k], line=ln, text=self.node_text(i))
+                   for i, (k, ln) in enumerate(zip(self.kinds, self.lines))],
+            edges=[(self.edges[i], self.edges[i + 1]) for i in range(0, len(self.edges), 2)],
+            predicates=self.predicates,
+        )
+
+    def nbytes(self) -> int:
+        """Bytes held by the node/edge arrays (the shared source is not counted)."""
+        return sum(a.itemsize * len(a) for a in (self.kinds, self.lines, self.starts, self.ends, self.edges))
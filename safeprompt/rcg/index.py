@@ -0,0 +1,176 @@
+from __future__ import annotations
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# One tokenizer pass over the whole file. Comments and string literals are matched
+# (and thereby skipped) before braces and keywords, so braces inside them never count.
+# The leading lookahead rejects most positions on their first character before any
+# alternative is tried, which makes the scan several times faster.
+_TOKEN_RE = re.compile(r'''
+  (?=[/"'{};cilfr])
+  (?:
+    (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<semi>;)
+  | \b(?P<ckind>contract|interface|library)\s+(?P<cname>\w+)
+  | \bfunction\s+(?P<fname>\w+)
+  | \b(?P<special>constructor|fallback|receive)(?=\s*\()
+  )
+''', re.VERBOSE)
+
+_PARAMS_RE = re.compile(r'\(([^)]*)\)')
+_VISIBILITY_RE = re.compile(r'\b(public|external|internal|private)\b')
+
+@dataclass(frozen=True)
+class ContractSpan:
+    name: str
+    kind: str
+    start: int
+    end: int
+    start_line: int
+    end_line: int
+
+@dataclass(frozen=True)
+class FunctionSpan:
+    name: str
+    contract: Optional[str]
+    signature: str
+    params: str
+    visibility: Optional[str]
+    has_body: bool
+    start: int          # offset of the `function` keyword
+    body_start: int     # offset of the opening brace (end of signature when there is no body)
+    end: int            # offset just past the closing brace
+    start_line: int
+    end_line: int
+
+@dataclass
+class ContractIndex:
+    """Contract and function spans of one Solidity source, built in a single pass."""
+    source: str = field(repr=False)
+    line_offsets: List[int] = field(repr=False)
+    contracts: List[ContractSpan] = field(default_factory=list)
+    functions: List[FunctionSpan] = field(default_factory=list)
+    _by_name: Dict[str, FunctionSpan] = field(default_factory=dict, repr=False)
+    _call_graph: Optional[Any] = field(default=None, repr=False)
+
+    @staticmethod
+    def build(src: str) -> "ContractIndex":
+        line_offsets = [0] + [m.end() for m in re.finditer(r'\n', src)]
+        idx = ContractIndex(source=src, line_offsets=line_offsets)
+
+        # each open brace remembers what it opened: ("contract", decl), ("function", decl, brace offset) or None
+        stack: List[Optional[tuple]] = []
+        pending_contract = None
+        pending_fn = None
+        current_contract: List[str] = []
+        fn_depth = 0
+
+        for m in _TOKEN_RE.finditer(src):
+            kind = m.lastgroup
+            if kind in ("comment", "string"):
+                continue
+            if kind == "cname":
+                pending_contract = (m.group("cname"), m.start(), m.group("ckind"))
+            elif kind in ("fname", "special"):
+                if pending_fn is None and fn_depth == 0:
+                    pending_fn = (m.group(kind), m.start())
+            elif kind == "open":
+                if pending_fn is not None:
+                    stack.append(("function", pending_fn, m.start()))
+                    pending_fn = None
+                    fn_depth += 1
+                elif pending_contract is not None:
+                    stack.append(("contract", pending_contract))
+                    current_contract.append(pending_contract[0])
+                    pending_contract = None
+                else:
+                    stack.append(None)
+            elif kind == "semi":
+                if pending_fn is not None:
+                    idx._add_function(pending_fn, m.start(), m.end(), current_contract, has_body=False)
+                    pending_fn = None
+            elif kind == "close":
+                if not stack:
+                    continue
+                owner = stack.pop()
+                if owner is None:
+                    continue
+                if owner[0] == "function":
+                    fn_depth -= 1
+                    idx._add_function(owner[1], owner[2], m.end(), current_contract, has_body=True)
+                else:
+                    name, start, ckind = owner[1]
+                    current_contract.pop()
+                    idx.contracts.append(ContractSpan(name, ckind, start, m.end(), idx.line_of(start), idx.line_of(m.end() - 1)))
+
+        # unterminated bodies run to the end of the file
+        for owner in reversed(stack):
+            if owner is None:
+                continue
+            if owner[0] == "function":
+                idx._add_function(owner[1], owner[2], len(src), current_contract, has_body=True)
+            else:
+                name, start, ckind = owner[1]
+                current_contract.pop()
+                idx.contracts.append(ContractSpan(name, ckind, start, len(src), idx.line_of(start), len(line_offsets)))
+
+        idx.contracts.sort(key=lambda c: c.start)
+        idx.functions.sort(key=lambda f: f.start)
+        for fn in idx.functions:
+            cur = idx._by_name.get(fn.name)
+            # prefer the first definition with a body; declarations only count when nothing else exists
+            if cur is None or (fn.has_body and not cur.has_body):
+                idx._by_name[fn.name] = fn
+        return idx
+
+    def _add_function(self, decl: tuple, sig_end: int, end: int, current_contract: List[str], has_body: bool) -> None:
+        name, start = decl
+        signature = " ".join(self.source[start:sig_end].split())
+        params = _PARAMS_RE.search(signature)
+        vis = _VISIBILITY_RE.search(signature)
+        self.functions.append(FunctionSpan(
+            name=name,
+            contract=current_contract[-1] if current_contract else None,
+            signature=signature,
+            params=params.group(1) if params else "",
+            visibility=vis.group(1) if vis else None,
+            has_body=has_body,
+            start=start,
+            body_start=sig_end,
+            end=end,
+            start_line=self.line_of(start),
+            end_line=self.line_of(end - 1),
+        ))
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing `offset`."""
+        return bisect_right(self.line_offsets, offset)
+
+    def line_text(self, ln: int) -> str:
+        """Text of 1-based line `ln` without its line terminator."""
+        start = self.line_offsets[ln - 1]
+        end = self.line_offsets[ln] - 1 if ln < len(self.line_offsets) else len(self.source)
+        return self.source[start:end]
+
+    def function(self, fn_name: str) -> FunctionSpan:
+        fn = self._by_name.get(fn_name)
+        if fn is None:
+            raise ValueError(f"function '{fn_name}' not found")
+        return fn
+
+    def call_graph(self) -> Any:
+        """The file's `callgraph.CallGraphIndex`, built on first use and shared by every function."""
+        if self._call_graph is None:
+            from .callgraph import CallGraphIndex
+            self._call_graph = CallGraphIndex.build(self)
+        return self._call_graph
+
+    def contract_name(self, fn: Optional[FunctionSpan] = None) -> str:
+        if fn is not None and fn.contract:
+            return fn.contract
+        return self.contracts[0].name if self.contracts else "UnknownContract"
@@ -0,0 +1,235 @@
+from __future__ import annotations
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Wire protocol: newline-delimited JSON over a Unix socket or localhost TCP.
+# Request:  {"id": ..., "contract": "<path>" | "source": "<solidity>", "witness": "<path>" | {...}, "out": "<dir>"?}
+# Response: {"id": ..., "ok": true, "result": <run summary>, "patched": ..., "diff": ...}
+#           {"id": ..., "ok": false, "error": "<message>"}
+# Responses are streamed back as jobs finish, so they may arrive out of request order.
+
+def _warm_worker() -> None:
+    # import and build everything a repair needs once, when the worker starts
+    from .operators.registry import registry
+    from . import pipeline  # noqa: F401
+    registry()
+
+def _run_one(job: Dict[str, Any]) -> Dict[str, Any]:
+    from .ingest import read_source
+    from .pipeline import repair_witness, write_outcome
+    try:
+        if "source" in job:
+            src = job["source"]
+            name = job.get("contract_name") or "contract.sol"
+        else:
+            path = Path(job["contract"])
+            src = read_source(path)
+            name = path.name
+        wit_obj = job["witness"]
+        if not isinstance(wit_obj, dict):
+            wit_obj = json.loads(Path(wit_obj).read_text(encoding="utf-8"))
+        outcome = repair_witness(src, wit_obj, name)
+        if job.get("out"):
+            write_outcome(outcome, Path(job["out"]))
+        resp = {"id": job.get("id"), "ok": True, "result": outcome.summary}
+        if outcome.certificate is not None and not job.get("out"):
+            resp["patched"] = outcome.patched
+            resp["diff"] = outcome.certificate.diff_unified
+        return resp
+    except Exception as e:  # report per job; the worker stays up
+        return {"id": job.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+async def _skip_line(reader: asyncio.StreamReader) -> None:
+    # drop the rest of an over-long request line, without buffering it
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+def _run_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [_run_one(job) for job in jobs]
+
+class RepairServer:
+    """Repair daemon that keeps `safeprompt.pipeline` warm in a pool of worker processes.
+
+    Incoming jobs go through a bounded queue; when it is full the server stops reading
+    from the client sockets, which pushes back on producers. A dispatcher drains the
+    queue and groups small jobs into batches so that one worker round-trip serves many
+    short repairs.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 256, batch_size: int = 16,
+                 batch_window: float = 0.002, small_job_bytes: int = 64 * 1024,
+                 max_request_bytes: int = 64 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.small_job_bytes = small_job_bytes
+        # one request line, inline `source` included; asyncio's default (64 KiB) is far below a flattened contract
+        self.max_request_bytes = max_request_bytes
+        self.stats = {"jobs": 0, "batches": 0, "errors": 0}
+
+    async def serve(self, unix_path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0,
+                    ready: Optional[asyncio.Future] = None) -> None:
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # keep at most two batches per worker in flight; the rest waits in the bounded queue
+        self._in_flight = asyncio.Semaphore(self.workers * 2)
+        # spawned (not forked) workers never inherit client sockets, so closing a connection really closes it
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                         mp_context=multiprocessing.get_context("spawn"))
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _run_batch, []) for _ in range(self.workers)))
+            if unix_path is not None:
+                if os.path.exists(unix_path):
+                    os.unlink(unix_path)
+                server = await asyncio.start_unix_server(self._handle, path=unix_path, limit=self.max_request_bytes)
+                address = unix_path
+            else:
+                server = await asyncio.start_server(self._handle, host=host, port=port, limit=self.max_request_bytes)
+                address = "%s:%d" % server.sockets[0].getsockname()[:2]
+            self._dispatcher = asyncio.create_task(self._dispatch())
+            if ready is not None:
+                ready.set_result(address)
+            async with server:
+                await server.serve_forever()
+        finally:
+            if getattr(self, "_dispatcher", None) is not None:
+                self._dispatcher.cancel()
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial  # a last line without a newline
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    await self._send(writer, lock, {"id": None, "ok": False,
+                                                    "error": f"bad request: longer than {self.max_request_bytes} bytes"})
+                    continue
+                if not line:
+                    break
+                try:
+                    job = json.loads(line)
+                    if not isinstance(job, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    await self._send(writer, lock, {"id": None, "ok": False, "error": f"bad request: {e}"})
+                    continue
+                done = asyncio.get_running_loop().create_future()
+                pending.add(done)
+                done.add_done_callback(pending.discard)
+                await self._queue.put((job, writer, lock, done))  # blocks while the queue is full
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, resp: Dict[str, Any]) -> None:
+        async with lock:
+            writer.write(json.dumps(resp).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    def _is_small(self, job: Dict[str, Any]) -> bool:
+        if "source" in job:
+            return len(job["source"]) <= self.small_job_bytes
+        try:
+            return os.path.getsize(job["contract"]) <= self.small_job_bytes
+        except (OSError, KeyError, TypeError):
+            return True
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            if self._is_small(batch[0][0]):
+                deadline = loop.time() + self.batch_window
+                while len(batch) < self.batch_size:
+                    if not self._queue.empty():
+                        item = self._queue.get_nowait()
+                    else:
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                        except asyncio.TimeoutError:
+                            break
+                    batch.append(item)
+                    if not self._is_small(item[0]):
+                        break
+            await self._in_flight.acquire()
+            asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch: List[tuple]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                responses = await loop.run_in_executor(self._pool, _run_batch, [item[0] for item in batch])
+            except Exception as e:  # e.g. a worker died; fail this batch only
+                responses = [{"id": item[0].get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"} for item in batch]
+            self.stats["batches"] += 1
+            for (job, writer, lock, done), resp in zip(batch, responses):
+                self.stats["jobs"] += 1
+                if not resp["ok"]:
+                    self.stats["errors"] += 1
+                try:
+                    await self._send(writer, lock, resp)
+                except (ConnectionError, RuntimeError):
+                    pass  # client went away; nothing to report to
+                done.set_result(None)
+        finally:
+            self._in_flight.release()
+
+def serve(unix_path: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765, **kwargs: Any) -> None:
+    """Run a RepairServer until interrupted."""
+    server = RepairServer(**kwargs)
+
+    async def main():
+        ready = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(server.serve(unix_path, host, port, ready=ready))
+        print("safeprompt repair server listening on", await ready, flush=True)
+        await task
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+def submit(jobs: Iterable[Dict[str, Any]], unix_path: Optional[str] = None, host: str = "127.0.0.1",
+           port: int = 8765) -> Iterator[Dict[str, Any]]:
+    """Blocking client: send `jobs` to a running server and yield responses as they arrive."""
+    jobs = list(jobs)
+    if unix_path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+
+    def send():
+        # write from a thread so a long job list cannot deadlock against unread responses
+        with sock.makefile("wb") as w:
+            for job in jobs:
+                w.write(json.dumps(job).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+
+    sender = threading.Thread(target=send, daemon=True)
+    with sock, sock.makefile("rb") as r:
+        sender.start()
+        for line in r:
+            yield json.loads(line)
+        sender.join()
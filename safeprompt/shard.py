@@ -0,0 +1,216 @@
+from __future__ import annotations
+import hashlib
+import json
+import statistics
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .pipeline import RepairJob, run_key
+
+# Multi-machine batch runs. Every job goes to the shard given by a hash of its run key
+# (output folder relative to the output root), so all machines agree on the split
+# without talking to each other. A shard logs each finished job to its checkpoint, and
+# `merge_checkpoints` turns the checkpoints of all shards into one aggregate that does
+# not depend on how many shards there were.
+
+CHECKPOINT_VERSION = 1
+
+# fields that depend on the machine, the worker a job landed on or cache state, not on the repair
+_VOLATILE_RUN = ("job", "timings", "key", "shard")
+_VOLATILE_TARGET = ("rcg_cache", "reused")
+_VOLATILE_ATTEMPT = ("clone",)
+
+def shard_of(key: str, count: int) -> int:
+    """Shard (0 <= shard < count) of the job with run key `key`."""
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % count
+
+def select_shard(jobs: Iterable[RepairJob], out_root: Path, index: int, count: int) -> List[RepairJob]:
+    """The jobs of shard `index` of `count`, in their original order."""
+    if not 0 <= index < count:
+        raise ValueError(f"shard {index} out of range for {count} shards")
+    return [job for job in jobs if shard_of(run_key(job.out_dir, out_root), count) == index]
+
+def checkpoint_path(out_root: Path, index: int, count: int) -> Path:
+    return out_root / f"checkpoint-{index}-of-{count}.jsonl"
+
+class Checkpoint:
+    """Append-only JSONL log of the finished jobs of one shard.
+
+    The first line records the shard and its job count; every later line is a batch
+    result with its run "key". With `resume`, jobs already logged are in `done` and
+    are not run again; otherwise an existing log is started over.
+    """
+
+    def __init__(self, path: Path, index: int, count: int, jobs: int, out_root: Path, resume: bool = False):
+        self.path = Path(path)
+        self.shard = [index, count]
+        self.out_root = out_root
+        self.done: Dict[str, Dict[str, Any]] = {}
+        header = {"checkpoint": CHECKPOINT_VERSION, "shard": self.shard, "jobs": jobs}
+        if resume and self.path.exists():
+            found, self.done = read_checkpoint(self.path)
+            if found != header:
+                raise RuntimeError(f"{self.path} was written for {found}, not {header}; rerun without --resume")
+            # drop a line torn by the interruption before appending
+            lines = [json.dumps(found, sort_keys=True)] + [json.dumps(r, sort_keys=True) for r in self.done.values()]
+            self.path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+            self._f = self.path.open("a", encoding="utf-8")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = self.path.open("w", encoding="utf-8")
+            self._f.write(json.dumps(header, sort_keys=True) + "\n")
+            self._f.flush()
+
+    def key(self, job: RepairJob) -> str:
+        return run_key(job.out_dir, self.out_root)
+
+    def append(self, result: Dict[str, Any]) -> None:
+        record = dict(result, key=run_key(Path(result["job"]["out_dir"]), self.out_root), shard=self.shard)
+        self._f.write(json.dumps(record, sort_keys=True) + "\n")
+        self._f.flush()  # a record is either complete on disk or dropped on resume
+        self.done[record["key"]] = record
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_checkpoint(path: Path) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """(header, records by run key) of a checkpoint; a torn last line is ignored."""
+    header: Dict[str, Any] = {}
+    records: Dict[str, Dict[str, Any]] = {}
+    with Path(path).open(encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            if n == 0:
+                header = obj
+            else:
+                records[obj["key"]] = obj
+    if header.get("checkpoint") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a checkpoint (version {CHECKPOINT_VERSION})")
+    return header, records
+
+def _stable(summary: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: v for k, v in summary.items() if k not in _VOLATILE_RUN}
+    if "targets" in out:
+        out["targets"] = [_stable_target(t) for t in out["targets"]]
+    else:
+        out = _stable_target(out)
+    return out
+
+def _stable_target(entry: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: v for k, v in entry.items() if k not in _VOLATILE_TARGET}
+    if "attempted" in out:
+        out["attempted"] = [{k: v for k, v in a.items() if k not in _VOLATILE_ATTEMPT} for a in out["attempted"]]
+    return out
+
+def _targets(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # per (contract, function) entries; a multi-target target counts as repaired only if it was composed
+    if "error" in summary:
+        return []
+    if "targets" in summary:
+        return [dict(t, accepted=bool(t.get("accepted")) and t.get("composed", False)) for t in summary["targets"]]
+    return [dict(summary, accepted=bool(summary.get("accepted")))]
+
+def merge_checkpoints(paths: Iterable[Path], allow_partial: bool = False) -> Dict[str, Any]:
+    """One aggregate of the runs logged in the checkpoints at `paths`.
+
+    Runs are keyed and sorted by run key and stripped of timings, paths and cache
+    details, so the aggregate is the same for any shard count. Unless
+    `allow_partial`, every shard of the run must be present and complete. A job
+    logged twice with different results raises ValueError.
+    """
+    runs: Dict[str, Dict[str, Any]] = {}
+    shards: Dict[int, Tuple[int, Set[str]]] = {}   # index -> (jobs, keys logged)
+    counts = set()
+    for path in sorted(Path(p) for p in paths):
+        header, records = read_checkpoint(path)
+        index, count = header["shard"]
+        counts.add(count)
+        shards.setdefault(index, (header["jobs"], set()))[1].update(records)
+        for key, record in records.items():
+            run = _stable(record)
+            if key in runs and runs[key] != run:
+                raise ValueError(f"conflicting results for {key} in {path}")
+            runs[key] = run
+
+    if len(counts) > 1:
+        raise ValueError(f"checkpoints of different shard counts: {sorted(counts)}")
+    if not allow_partial and counts:
+        count = counts.pop()
+        missing = [i for i in range(count) if i not in shards]
+        if missing:
+            raise ValueError(f"missing shard(s) {missing} of {count}")
+        short = [f"{i} ({len(keys)}/{jobs})" for i, (jobs, keys) in sorted(shards.items()) if len(keys) < jobs]
+        if short:
+            raise ValueError("incomplete shard(s): " + ", ".join(short))
+
+    by_class: Dict[str, Dict[str, Any]] = {}
+    candidates: Dict[str, List[int]] = {}
+    for key in sorted(runs):
+        for t in _targets(runs[key]):
+            vc = str(t.get("vuln_class", "unknown"))
+            totals = by_class.setdefault(vc, {"targets": 0, "accepted": 0})
+            totals["targets"] += 1
+            totals["accepted"] += t["accepted"]
+            candidates.setdefault(vc, []).append(len(t.get("attempted", [])))
+    for vc, totals in by_class.items():
+        c = candidates[vc]
+        totals["candidates_mean"] = round(statistics.fmean(c), 2)
+        totals["candidates_std"] = round(statistics.stdev(c), 2) if len(c) > 1 else 0.0
+
+    return {
+        "jobs": len(runs),
+        "errors": sorted(key for key, run in runs.items() if "error" in run),
+        "by_vuln_class": {vc: by_class[vc] for vc in sorted(by_class)},
+        "runs": {key: runs[key] for key in sorted(runs)},
+    }
+
+# header of the data/*_repair.csv tables
+REPAIR_CSV_COLUMNS = [
+    "dataset", "size", "avg_candidates_mean", "avg_candidates_std", "gas_delta_M_mean", "gas_delta_M_std",
+    "repair_time_s_mean", "repair_time_s_std", "tp", "fn", "tn", "fp", "tp_percent", "fn_percent", "tn_percent",
+    "fp_percent",
+]
+
+def repair_csv_row(totals: Dict[str, Any], dataset: str = "Vulnerable") -> Dict[str, Any]:
+    """A data/*_repair.csv row for one vulnerability class of a merged run.
+
+    Every target comes from a witness, so an accepted repair counts as a true positive
+    and an abstention as a false negative. Gas and repair time are not measured by the
+    reference pipeline (timings are left out to keep the aggregate deterministic), and
+    benign contracts are not part of a repair run, so those columns stay empty.
+    """
+    size, tp = totals["targets"], totals["accepted"]
+    fn = size - tp
+    row: Dict[str, Any] = {c: "" for c in REPAIR_CSV_COLUMNS}
+    row.update(dataset=dataset, size=size, avg_candidates_mean=totals["candidates_mean"],
+               avg_candidates_std=totals["candidates_std"], tp=tp, fn=fn,
+               tp_percent=round(100.0 * tp / size, 2) if size else "",
+               fn_percent=round(100.0 * fn / size, 2) if size else "")
+    return row
+
+def write_repair_csvs(aggregate: Dict[str, Any], out_dir: Path, dataset: str = "Vulnerable") -> List[Path]:
+    """Write <vuln_class>_repair.csv per vulnerability class of `aggregate` into `out_dir`."""
+    import csv
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for vc, totals in aggregate["by_vuln_class"].items():
+        path = out_dir / f"{vc}_repair.csv"
+        with path.open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=REPAIR_CSV_COLUMNS, lineterminator="\n")
+            w.writeheader()
+            w.writerow(repair_csv_row(totals, dataset))
+        written.append(path)
+    return written
+
+def write_aggregate(aggregate: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(aggregate, indent=2, sort_keys=True) + "\n", encoding="utf-8")
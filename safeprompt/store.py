@@ -0,0 +1,150 @@
+from __future__ import annotations
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# One row per repair run (what would otherwise be an output folder) plus one row per
+# target, so corpus-wide questions ("all accepted cei_reorder repairs") are index lookups.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,           -- output folder the run stands for, relative to the export root
+    contract TEXT,
+    contract_sha256 TEXT,
+    witness TEXT,
+    accepted INTEGER NOT NULL,
+    error TEXT,                     -- set for a job that failed; its summary is then {"contract", "error"}
+    summary TEXT NOT NULL,          -- run_summary.json, byte for byte
+    patched TEXT,
+    certificate TEXT,
+    diff TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS targets (
+    key TEXT NOT NULL REFERENCES results(key) ON DELETE CASCADE,
+    function TEXT,
+    vuln_class TEXT,
+    operator TEXT,
+    accepted INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_contract ON results(contract_sha256);
+CREATE INDEX IF NOT EXISTS targets_key ON targets(key);
+CREATE INDEX IF NOT EXISTS targets_function ON targets(function);
+CREATE INDEX IF NOT EXISTS targets_operator ON targets(operator, accepted);
+"""
+
+ARTIFACTS = ("patched.sol", "certificate.json", "diff.patch", "run_summary.json")
+
+class ResultStore:
+    """Repair results in one SQLite file instead of a folder of small files per run.
+
+    Writes are buffered and committed `batch_size` at a time in a single transaction.
+    Only one process should write; workers hand their artifacts to the parent.
+    `export` rebuilds the usual per-run folders on demand. Failed jobs are kept as
+    runs with an error and no targets; see `errors`.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 256):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+        self._pending: List[tuple] = []
+
+    def add(self, key: str, files: Dict[str, str], contract_sha256: Optional[str] = None,
+            job: Optional[Dict[str, str]] = None) -> None:
+        """Queue one run: `files` maps artifact names (see ARTIFACTS) to their text."""
+        self._pending.append((key, files, contract_sha256, job or {}))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        rows, targets, keys = [], [], []
+        now = time.time()
+        for key, files, digest, job in self._pending:
+            summary = json.loads(files["run_summary.json"])
+            entries = [] if "error" in summary else summary.get("targets", [summary])
+            rows.append((key, summary.get("contract"), digest, job.get("witness"), int(bool(summary.get("accepted"))),
+                         summary.get("error"), files["run_summary.json"], files.get("patched.sol"),
+                         files.get("certificate.json"), files.get("diff.patch"), now))
+            keys.append((key,))
+            for t in entries:
+                attempts = t.get("attempted") or [{}]
+                accepted = t.get("accepted")
+                targets.append((key, t.get("function"), t.get("vuln_class"),
+                                accepted["operator"] if accepted else attempts[-1].get("operator"),
+                                int(bool(accepted)) if t.get("composed", True) else 0))
+        with self._db:
+            self._db.executemany("DELETE FROM targets WHERE key = ?", keys)
+            self._db.executemany("INSERT OR REPLACE INTO results VALUES (?,?,?,?,?,?,?,?,?,?,?)", rows)
+            self._db.executemany("INSERT INTO targets VALUES (?,?,?,?,?)", targets)
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def summary(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT summary FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, operator: Optional[str] = None, function: Optional[str] = None, vuln_class: Optional[str] = None,
+              accepted: Optional[bool] = None, contract_sha256: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Targets matching every given filter, one dict per (run, target)."""
+        where, args = [], []
+        for column, value in (("t.operator", operator), ("t.function", function), ("t.vuln_class", vuln_class),
+                              ("r.contract_sha256", contract_sha256)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if accepted is not None:
+            where.append("t.accepted = ?")
+            args.append(int(accepted))
+        sql = ("SELECT r.key, r.contract, r.contract_sha256, t.function, t.vuln_class, t.operator, t.accepted "
+               "FROM targets t JOIN results r ON r.key = t.key")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.key, t.rowid"
+        for key, contract, digest, fn, vuln, op, ok in self._db.execute(sql, args):
+            yield {"key": key, "contract": contract, "contract_sha256": digest, "function": fn,
+                   "vuln_class": vuln, "operator": op, "accepted": bool(ok)}
+
+    def errors(self) -> Iterator[Dict[str, Any]]:
+        """The failed runs: key, contract, witness and error message."""
+        self.flush()
+        sql = "SELECT key, contract, witness, error FROM results WHERE error IS NOT NULL ORDER BY key"
+        for key, contract, witness, error in self._db.execute(sql):
+            yield {"key": key, "contract": contract, "witness": witness, "error": error}
+
+    def export(self, out_root: Path, keys: Optional[Iterator[str]] = None) -> int:
+        """Write the per-run folders (patched.sol, certificate.json, diff.patch, run_summary.json) under `out_root`.
+
+        Failed runs are skipped, as a batch run writes no folder for them.
+        """
+        self.flush()
+        wanted = None if keys is None else set(keys)
+        n = 0
+        sql = "SELECT key, patched, certificate, diff, summary FROM results WHERE error IS NULL ORDER BY key"
+        for row in self._db.execute(sql):
+            if wanted is not None and row[0] not in wanted:
+                continue
+            out_dir = Path(out_root) / row[0]
+            out_dir.mkdir(parents=True, exist_ok=True)
+            for name, text in zip(ARTIFACTS, row[1:]):
+                if text is not None:
+                    (out_dir / name).write_text(text, encoding="utf-8")
+            n += 1
+        return n
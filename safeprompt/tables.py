@@ -0,0 +1,154 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import HashCache, sha256_file
+
+# pandas and tabulate are imported inside the functions that use them, so importing
+# this module (e.g. for `safeprompt --help`) stays cheap.
+
+# bump when latex_table/markdown_table change their output
+RENDERER_VERSION = 1
+
+TABLE_SPECS: List[Tuple[str, str, str]] = [
+    ("table2_reentrancy.csv",
+     "Table 2: Reentrancy repair evaluation (SafePrompt).",
+     "tab:rq_reentrancy"),
+    ("table3_price_manip.csv",
+     "Table 3: Price-manipulation repair evaluation (SafePrompt).",
+     "tab:rq_price"),
+    ("table3_price_manip_fp_breakdown.csv",
+     "Table 3 (continued): False-positive breakdown by benign category.",
+     "tab:rq_price_fp_breakdown"),
+    ("table4_reentrancy_comparison.csv",
+     "Table 4: Reentrancy comparison against prior systems.",
+     "tab:reentrancy_compare"),
+    ("table5_price_manip_comparison_d1.csv",
+     "Table 5: Price-manipulation comparison on D1 benchmark.",
+     "tab:price_compare_d1"),
+    ("table6_ablation.csv",
+     "Table 6: Ablation study.",
+     "tab:ablation"),
+    ("table7_readonly_reentrancy.csv",
+     "Table 7: Read-only reentrancy evaluation.",
+     "tab:readonly"),
+]
+
+def latex_table(df: Any, caption: str, label: str) -> str:
+    # three-line table with booktabs
+    cols = list(df.columns)
+    align = "l" + "c" * (len(cols) - 1)
+    header = " & ".join([f"\\textbf{{{c}}}" for c in cols]) + " \\\\"
+    rows = []
+    for _, r in df.iterrows():
+        rows.append(" & ".join(str(r[c]) for c in cols) + " \\\\")
+    body = "\n".join(rows)
+    return "\n".join([
+        "\\begin{table}[t]",
+        "\\centering",
+        f"\\caption{{{caption}}}",
+        f"\\label{{{label}}}",
+        f"\\begin{{tabular}}{{{align}}}",
+        "\\toprule",
+        header,
+        "\\midrule",
+        body,
+        "\\bottomrule",
+        "\\end{tabular}",
+        "\\end{table}",
+        "",
+    ])
+
+def markdown_table(df: Any) -> str:
+    from tabulate import tabulate
+    return tabulate(df, headers="keys", tablefmt="github", showindex=False)
+
+def _renderer() -> Dict[str, str]:
+    # what the rendered text depends on besides the CSV and the spec
+    from importlib.metadata import PackageNotFoundError, version
+    out = {"safeprompt": str(RENDERER_VERSION)}
+    for dist in ("pandas", "tabulate"):
+        try:
+            out[dist] = version(dist)
+        except PackageNotFoundError:
+            out[dist] = "unknown"
+    return out
+
+def render_table(csv_path: Path, caption: str, label: str, md_path: Path, tex_path: Path) -> Tuple[str, str]:
+    """Render one CSV as markdown and LaTeX; returns the sha256 of both outputs."""
+    import pandas as pd
+    df = pd.read_csv(csv_path)
+    md_path.write_text(markdown_table(df) + "\n", encoding="utf-8")
+    tex_path.write_text(latex_table(df, caption, label), encoding="utf-8")
+    return sha256_file(md_path), sha256_file(tex_path)
+
+def _render(job: Tuple[Path, str, str, Path, Path]) -> Tuple[str, str]:
+    return render_table(*job)
+
+def reproduce_tables(data_dir: Path, out_md: Path, out_tex: Path, manifest_path: Optional[Path] = None,
+                     cache: Optional[HashCache] = None, workers: Optional[int] = None, force: bool = False,
+                     specs: List[Tuple[str, str, str]] = TABLE_SPECS) -> Dict[str, List[str]]:
+    """Render every table in `specs` from its CSV as markdown and LaTeX.
+
+    With a `manifest_path`, the manifest records each table's input hash and output
+    hashes, and a table whose CSV, spec and outputs are unchanged since the last run
+    is skipped (`force` renders everything). Hashing and rendering use up to
+    `workers` threads/processes (default: CPU count). Returns the table stems that
+    were "rendered" and "skipped", and the CSVs in `data_dir` that no spec covers
+    ("untracked"); those are not rendered, and the manifest lists them too.
+    """
+    out_md.mkdir(parents=True, exist_ok=True)
+    out_tex.mkdir(parents=True, exist_ok=True)
+    cache = cache if cache is not None else HashCache()
+    workers = workers or os.cpu_count() or 1
+    jobs = {Path(fname).stem: (data_dir / fname, caption, label,
+                               out_md / f"{Path(fname).stem}.md", out_tex / f"{Path(fname).stem}.tex")
+            for fname, caption, label in specs}
+    untracked = sorted(p.name for p in data_dir.glob("*.csv") if p.stem not in jobs)
+
+    renderer = _renderer()
+    previous: Dict[str, Any] = {}
+    if manifest_path is not None and not force and manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except ValueError:
+            manifest = {}
+        if manifest.get("renderer") == renderer:
+            previous = manifest.get("tables", {})
+
+    inputs = cache.hash_many([job[0] for job in jobs.values()], workers=workers)
+    outputs = cache.hash_many([p for stem, job in jobs.items() if stem in previous
+                               for p in job[3:] if p.exists()], workers=workers)
+    tables: Dict[str, Dict[str, str]] = {}
+    stale = []
+    for stem, (csv_path, caption, label, md_path, tex_path) in jobs.items():
+        entry = {"csv": inputs[csv_path], "caption": caption, "label": label}
+        old = previous.get(stem, {})
+        if ({k: old.get(k) for k in entry} == entry
+                and outputs.get(md_path) == old.get("md") and outputs.get(tex_path) == old.get("tex")):
+            tables[stem] = old
+        else:
+            tables[stem] = entry
+            stale.append(stem)
+
+    if workers > 1 and len(stale) > 1:
+        # one process per table: markdown rendering is pure Python and would serialise on the GIL
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            rendered = list(pool.map(_render, [jobs[stem] for stem in stale]))
+    else:
+        rendered = [_render(jobs[stem]) for stem in stale]
+    for stem, (md_hash, tex_hash) in zip(stale, rendered):
+        tables[stem].update(md=md_hash, tex=tex_hash)
+
+    if manifest_path is not None:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"renderer": renderer, "tables": tables, "untracked": untracked}, indent=2,
+                                  sort_keys=True) + "\n",
+                       encoding="utf-8")
+        os.replace(tmp, manifest_path)
+    cache.save()
+    return {"rendered": stale, "skipped": [stem for stem in jobs if stem not in stale], "untracked": untracked}
@@ -1,9 +1,12 @@
 
 from __future__ import annotations
 import hashlib
+import json
+import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 def sha256_file(path: Path) -> str:
     h = hashlib.sha256()
@@ -12,6 +15,78 @@ def sha256_file(path: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
+class HashCache:
+    """`sha256_file` results keyed by path, size and mtime, so unchanged files are not re-read.
+
+    Entries persist in the JSON file `path` (None keeps them in memory only). A file
+    modified within the last `racy_seconds` is hashed but not remembered: another
+    write inside the same mtime tick would otherwise go unnoticed.
+    """
+
+    def __init__(self, path: Optional[Path] = None, racy_seconds: float = 2.0):
+        self.path = Path(path) if path is not None else None
+        self.racy_seconds = racy_seconds
+        self._entries: Dict[str, List[Any]] = {}
+        self._dirty = False
+        self._counters = {"hits": 0, "misses": 0}
+        if self.path is not None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def _lookup(self, path: Path) -> Tuple[str, Optional[os.stat_result], Optional[str]]:
+        key = str(path.resolve())
+        st = path.stat()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return key, st, entry[2]
+        return key, st, None
+
+    def _remember(self, key: str, st: os.stat_result, digest: str) -> None:
+        if time.time() - st.st_mtime > self.racy_seconds:
+            self._entries[key] = [st.st_size, st.st_mtime_ns, digest]
+            self._dirty = True
+
+    def hash(self, path: Path) -> str:
+        return self.hash_many([path], workers=1)[path]
+
+    def hash_many(self, paths: Iterable[Path], workers: Optional[int] = None) -> Dict[Path, str]:
+        """sha256 of every path; files not in the cache are hashed on `workers` threads."""
+        out: Dict[Path, str] = {}
+        todo = []
+        for path in paths:
+            key, st, digest = self._lookup(path)
+            if digest is not None:
+                self._counters["hits"] += 1
+                out[path] = digest
+            else:
+                self._counters["misses"] += 1
+                todo.append((path, key, st))
+        if len(todo) > 1 and workers != 1:
+            # hashlib releases the GIL on large buffers, so threads overlap reads and hashing
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(sha256_file, [path for path, _, _ in todo]))
+        else:
+            digests = [sha256_file(path) for path, _, _ in todo]
+        for (path, key, st), digest in zip(todo, digests):
+            self._remember(key, st, digest)
+            out[path] = digest
+        return out
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._entries, sort_keys=True, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
 @dataclass(frozen=True)
 class Witness:
     vuln_class: str
@@ -29,3 +104,9 @@ class Witness:
             state_write_line=obj.get("state_write_line"),
             extra={k: v for k, v in obj.items() if k not in {"vuln_class","function","external_call_line","state_write_line"}},
         )
+
+    @staticmethod
+    def targets_from_json(obj: Dict[str, Any]) -> List["Witness"]:
+        # multi-target witness: {"targets": [{function, vuln_class, ...}, ...]}; other top-level keys are shared defaults
+        shared = {k: v for k, v in obj.items() if k != "targets"}
+        return [Witness.from_json({**shared, **t}) for t in obj.get("targets", [])]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from .utils import HashCache
+
+def verify_outputs(expected_path: Path, root: Path, cache: Optional[HashCache] = None,
+                   workers: Optional[int] = None) -> List[str]:
+    """Problems found comparing the files under `root` with the hashes in `expected_path`; empty if all match.
+
+    Files are hashed through `cache` (in-memory if None), on `workers` threads.
+    """
+    expected = json.loads(expected_path.read_text(encoding="utf-8"))
+    cache = cache if cache is not None else HashCache()
+    present = [root / rel for rel in expected if (root / rel).exists()]
+    got = cache.hash_many(present, workers=workers)
+    cache.save()
+    problems = []
+    for rel, h in expected.items():
+        path = root / rel
+        if path not in got:
+            problems.append(f"MISSING: {rel}")
+        elif got[path] != h:
+            problems.append(f"MISMATCH: {rel}\n expected: {h}\n got     : {got[path]}")
+    return problems
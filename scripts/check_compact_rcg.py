@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.bench import SynthParams, generate_contract  # noqa: E402
+from safeprompt.rcg.build_rcg import build_rcg  # noqa: E402
+from safeprompt.rcg.cache import RCGCache  # noqa: E402
+from safeprompt.rcg.compact import CompactRCG  # noqa: E402
+from safeprompt.rcg.index import ContractIndex  # noqa: E402
+
+# Round-trip check for CompactRCG: every function of the example and of synthetic
+# contracts goes RepairContextGraph -> CompactRCG -> RepairContextGraph, through the
+# JSON payload the RCG cache stores, and through the cache's memory and disk tiers,
+# also into a copy of the file where the code around the function has moved.
+
+def _moved(src: str) -> str:
+    # same functions, different offsets and line numbers
+    lines = src.splitlines(True)
+    at = next(i for i, l in enumerate(lines) if l.lstrip().startswith("contract ")) + 1
+    return "".join(lines[:at] + ["    uint256 private __moved;\n", "\n"] + lines[at:])
+
+def check(src: str, cache_dir: Path) -> List[str]:
+    failures = []
+    memory = RCGCache(cache_dir)
+    for text in (src, _moved(src)):
+        index = ContractIndex.build(text)
+        for fn in sorted({f.name for f in index.functions}):
+            local = build_rcg(text, fn, index, interprocedural=False)
+            compact = CompactRCG.from_rcg(local, text, index)
+            first = index.function(fn).start_line
+            span_start = index.line_offsets[first - 1]
+            payload = json.loads(json.dumps(compact.to_payload(span_start, first)))
+            back = CompactRCG.from_payload(payload, text, span_start, first, local.contract_name, fn)
+            full = build_rcg(text, fn, index)
+            checks = {
+                "to_rcg": compact.to_rcg() == local,
+                "payload": back.to_rcg() == local,
+                "memory tier": memory.build_rcg(text, fn, index)[0] == full,
+                "disk tier": RCGCache(cache_dir).build_rcg(text, fn, index)[0] == full,
+            }
+            failures += [f"{fn}: {name}" for name, ok in checks.items() if not ok]
+    if not memory.stats()["memory_hits"]:
+        failures.append(f"memory tier never hit: {memory.stats()}")
+    return failures
+
+def main():
+    p = argparse.ArgumentParser(description="Check that CompactRCG and the RCG cache round-trip RCGs losslessly.")
+    p.add_argument("--seeds", type=int, default=5, help="Synthetic contracts to check besides the example")
+    args = p.parse_args()
+
+    sources = [(REPO_ROOT / "examples" / "contracts" / "ReentrancyVictim.sol").read_text(encoding="utf-8")]
+    sources += [generate_contract(SynthParams(functions=20, nesting=seed % 3, external_calls=1 + seed, seed=seed))[0]
+                for seed in range(args.seeds)]
+    failures = []
+    for src in sources:
+        with tempfile.TemporaryDirectory() as tmp:
+            failures += check(src, Path(tmp))
+    for line in failures[:5]:
+        print("FAIL", line)
+    print(f"{len(sources)} contracts, {len(failures)} failed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.cert.checker import scoped_unified_diff  # noqa: E402
+
+# Round-trip check for certificate diffs: random Solidity-like edits are diffed with
+# scoped_unified_diff and the diff is applied back to the original, both by a strict
+# applier below and (if installed) by GNU patch.
+
+_HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+_LINES = ["}", "", "    }", "        x += 1;", "    uint256 a = b;", "    function f() public {",
+          "        require(ok);", "    // note", "        balances[msg.sender] = 0;", "{"]
+
+def apply_strict(before: str, diff: str, context: int = 3) -> Optional[str]:
+    """`diff` applied to `before`, or None if a hunk does not apply at its stated position.
+
+    Like GNU patch, a hunk with less trailing (leading) context than `context` must end
+    (start) at the end (start) of the file.
+    """
+    src = before.splitlines(True)
+    out: List[str] = []
+    pos = 0
+    lines = diff.splitlines(True)[2:]
+    i = 0
+    while i < len(lines):
+        m = _HUNK.match(lines[i])
+        if m is None:
+            return None
+        old_start, old_count = int(m.group(1)), int(m.group(2) or 1)
+        first = old_start - 1 if old_count else old_start
+        body = []
+        i += 1
+        while i < len(lines) and not lines[i].startswith("@@"):
+            body.append(lines[i])
+            i += 1
+        old = [l[1:] for l in body if l[0] in " -"]
+        lead = next((n for n, l in enumerate(body) if l[0] != " "), len(body))
+        trail = next((n for n, l in enumerate(reversed(body)) if l[0] != " "), len(body))
+        if first < pos or src[first:first + len(old)] != old:
+            return None
+        if lead < context and first != 0:
+            return None
+        if trail < context and first + len(old) != len(src):
+            return None
+        out += src[pos:first] + [l[1:] for l in body if l[0] in " +"]
+        pos = first + len(old)
+    return "".join(out + src[pos:])
+
+def apply_gnu(before: str, diff: str) -> Optional[str]:
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "before.sol"
+        target.write_text(before, encoding="utf-8")
+        proc = subprocess.run(["patch", "--silent", "--force", "-F0", str(target)], input=diff, text=True,
+                              capture_output=True)
+        return target.read_text(encoding="utf-8") if proc.returncode == 0 else None
+
+def random_case(rng: random.Random) -> tuple:
+    before = [rng.choice(_LINES) for _ in range(rng.randint(5, 120))]
+    after = list(before)
+    at = rng.randint(0, len(after))
+    for _ in range(rng.randint(1, 3)):  # an operator's edit: a few lines in one place
+        k = min(len(after), at + rng.randint(-3, 3))
+        k = max(0, k)
+        op = rng.random()
+        if op < 0.6 or not after or k >= len(after):
+            after.insert(k, rng.choice(_LINES))
+        elif op < 0.8:
+            del after[k]
+        else:
+            after[k] = rng.choice(_LINES)
+    if rng.random() < 0.3:  # plus a declaration near the header
+        after.insert(min(1, len(after)), "    bool private __safeprompt_entered;")
+    return "".join(l + "\n" for l in before), "".join(l + "\n" for l in after)
+
+def main():
+    p = argparse.ArgumentParser(description="Check that certificate diffs apply back to the original contract.")
+    p.add_argument("--cases", type=int, default=3000, help="Random edits to try")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-gnu-patch", action="store_true", help="Skip applying with GNU patch even if installed")
+    args = p.parse_args()
+
+    gnu = shutil.which("patch") is not None and not args.no_gnu_patch
+    rng = random.Random(args.seed)
+    failures = 0
+    for n in range(args.cases):
+        before, after = random_case(rng)
+        diff = scoped_unified_diff(before, after)
+        if before == after:
+            continue
+        bad = [name for name, apply in (("strict", apply_strict), ("gnu patch", apply_gnu if gnu else None))
+               if apply is not None and apply(before, diff) != after]
+        if bad:
+            failures += 1
+            if failures <= 3:
+                print(f"FAIL case {n} ({', '.join(bad)}):\n{diff}")
+    print(f"{args.cases} cases, {failures} failed" + ("" if gnu else " (GNU patch not installed; strict applier only)"))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
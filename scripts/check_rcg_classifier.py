@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import itertools
+import random
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.bench import rcg_mismatches  # noqa: E402
+
+# Equivalence check for the single-scan RCG classifier (build_rcg's _CLASSIFY_RE) against
+# the original per-line heuristics (bench._reference_rcg). Lines are built from fragments
+# that hit every branch of the alternation (external calls, guards, vetoes, comments,
+# assignments with and without a right-hand side) plus near misses and string literals
+# holding those tokens, in every pairwise order and in random combinations.
+
+_FRAGMENTS = [
+    # ext
+    ".call", ".call(", ".call{value: 1}(", ".delegatecall(", ".staticcall(", ".callx(", ".caller",
+    "transfer(", ".transfer(", "xtransfer(", "transfer (", "send(", ".send(", "resend(",
+    # guard
+    "require(", "assert(", "require (", "xrequire(", "assert (",
+    # veto
+    "==", "!=", "<=", ">=", "===", "memory", "calldata", "memoryx", "_calldata",
+    # comment
+    "//", "/", "///", "/* c */", "/*=*/",
+    # assign / tail
+    "=", "= ", " = ", "=x", "= =", "+=", "-=", "*=", "x +=", "x -= 1", "b[i] -=", "b[i] += 1", "b[i][j] -=", "=>",
+    # literals holding the tokens
+    '"=="', "'//'", '"require("', '".call"', '"memory"', '"a = b"', "'='",
+    # filler
+    "x", "b", "msg.sender", "(", ")", ";", ",", "1", "a.b",
+]
+_SEPARATORS = ["", " ", "  ", "\t"]
+_INDENTS = ["", "    ", "        ", "\t"]
+
+def pairwise_lines() -> List[str]:
+    lines = []
+    for a, b in itertools.product(_FRAGMENTS, repeat=2):
+        for sep in ("", " "):
+            lines.append(a + sep + b)
+    return lines
+
+def random_lines(rng: random.Random, count: int) -> List[str]:
+    lines = []
+    for _ in range(count):
+        parts = [rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 5))]
+        line = rng.choice(_INDENTS) + "".join(p + rng.choice(_SEPARATORS) for p in parts)
+        if rng.random() < 0.2:
+            line += rng.choice(["", " ", "  "])  # trailing whitespace after a bare "="
+        lines.append(line.rstrip("\n"))
+    return lines
+
+def _contained(line: str) -> bool:
+    # a "/*" left open (e.g. "/" followed by "*=") would comment out the functions after it
+    start = line.find("/*")
+    return start == -1 or line.find("*/", start + 2) != -1
+
+def contract_of(lines: List[str]) -> Tuple[str, List[str]]:
+    # one function per line; "{", "}" and "function" stay out of the fragments so spans are unambiguous
+    out = ["pragma solidity ^0.8.20;", "", "contract Lines {"]
+    names = []
+    for n, line in enumerate(lines):
+        names.append(f"f{n}")
+        out += [f"    function f{n}() external {{", "        " + line, "    }", ""]
+    out.append("}")
+    return "\n".join(out) + "\n", names
+
+def main():
+    p = argparse.ArgumentParser(description="Check the single-scan RCG classifier against the per-line reference.")
+    p.add_argument("--cases", type=int, default=20000, help="Random lines on top of every fragment pair")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--chunk", type=int, default=500, help="Lines per synthetic contract")
+    args = p.parse_args()
+
+    lines = [l for l in pairwise_lines() + random_lines(random.Random(args.seed), args.cases) if _contained(l)]
+    failed: List[str] = []
+    for i in range(0, len(lines), args.chunk):
+        chunk = lines[i:i + args.chunk]
+        src, names = contract_of(chunk)
+        for fn in rcg_mismatches(src, names):
+            failed.append(chunk[int(fn[1:])])
+    for line in failed[:5]:
+        print(f"MISMATCH: {line!r}")
+    print(f"{len(lines)} lines, {len(failed)} mismatched")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# modules `safeprompt repair --help` must not load; they belong to other subcommands
+HEAVY = ("pandas", "numpy", "matplotlib", "tabulate", "sqlite3", "multiprocessing")
+
+_LOADED = """
+import json, sys
+from safeprompt.cli import main
+try:
+    main(["repair", "--help"])
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+def _best(cmd: List[str], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+def main():
+    p = argparse.ArgumentParser(description="Check that the safeprompt CLI starts within its time budget.")
+    p.add_argument("--help-budget-ms", type=float, default=300.0, help="Budget for `safeprompt repair --help`")
+    p.add_argument("--repair-budget-ms", type=float, default=1000.0, help="Budget for the example repair")
+    p.add_argument("--runs", type=int, default=5, help="Runs per command; the fastest counts")
+    args = p.parse_args()
+
+    failed = False
+    out = subprocess.run([sys.executable, "-c", _LOADED], cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+    loaded = set(json.loads(out.stdout.splitlines()[-1]))
+    heavy = [m for m in HEAVY if m in loaded]
+    if heavy:
+        print("FAIL: `repair --help` imports", ", ".join(heavy))
+        failed = True
+
+    help_ms = _best([sys.executable, "-m", "safeprompt", "repair", "--help"], args.runs)
+    with tempfile.TemporaryDirectory() as tmp:
+        repair_ms = _best([sys.executable, "-m", "safeprompt", "repair", "--out", tmp], args.runs)
+    for name, ms, budget in (("repair --help", help_ms, args.help_budget_ms),
+                             ("repair (example)", repair_ms, args.repair_budget_ms)):
+        status = "ok" if ms <= budget else "OVER BUDGET"
+        print(f"{name:18s} {ms:8.1f} ms  (budget {budget:.0f} ms)  {status}")
+        failed |= ms > budget
+
+    if failed:
+        return 1
+    print("OK: CLI startup within budget.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
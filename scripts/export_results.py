@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.store import ResultStore  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Query a result store and export runs to the per-run folder layout.")
+    p.add_argument("--store", required=True, help="SQLite result store written by run_batch_repair.py --store")
+    p.add_argument("--out", default=None, help="Write the matching runs as folders under this directory")
+    p.add_argument("--operator", default=None)
+    p.add_argument("--function", default=None)
+    p.add_argument("--vuln-class", default=None)
+    p.add_argument("--accepted", choices=("yes", "no"), default=None)
+    p.add_argument("--contract-sha256", default=None)
+    p.add_argument("--list", action="store_true", help="Print the matching targets as JSON lines")
+    p.add_argument("--errors", action="store_true", help="Print the failed runs as JSON lines")
+    args = p.parse_args()
+
+    if not Path(args.store).exists():
+        raise SystemExit(f"no such store: {args.store}")
+    filters = {
+        "operator": args.operator,
+        "function": args.function,
+        "vuln_class": args.vuln_class,
+        "accepted": None if args.accepted is None else args.accepted == "yes",
+        "contract_sha256": args.contract_sha256,
+    }
+    with ResultStore(Path(args.store)) as store:
+        if args.errors:
+            for row in store.errors():
+                print(json.dumps(row, sort_keys=True))
+        rows = list(store.query(**filters))
+        if args.list:
+            for row in rows:
+                print(json.dumps(row, sort_keys=True))
+        if args.out:
+            filtered = any(v is not None for v in filters.values())
+            n = store.export(Path(args.out), keys=[r["key"] for r in rows] if filtered else None)
+            print(f"Exported {n} runs to {Path(args.out).resolve()}", file=sys.stderr)
+        elif not args.list and not args.errors:
+            print(f"{len(rows)} matching targets in {len({r['key'] for r in rows})} runs", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.bench import compare, default_grid, run_suite  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the SafePrompt pipeline stages on synthetic contracts.")
+    p.add_argument("--out", default="outputs/bench/latest.json", help="Where to write the benchmark JSON")
+    p.add_argument("--compare", default=None, help="Baseline JSON to diff against; exits non-zero on regressions")
+    p.add_argument("--threshold", type=float, default=1.25, help="p50 slowdown factor reported as a regression")
+    p.add_argument("--repeats", type=int, default=3, help="Passes over each synthetic contract")
+    p.add_argument("--max-functions", type=int, default=20, help="Functions repaired per contract")
+    p.add_argument("--quick", action="store_true", help="Smaller sweep for a fast sanity run")
+    args = p.parse_args()
+
+    report = run_suite(default_grid(args.quick), repeats=args.repeats, max_functions=args.max_functions)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    for r in report["results"]:
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items() if k != "seed")
+        stages = "  ".join(f"{name} p50={s['p50_ms']:.3f}ms" for name, s in r["stages"].items())
+        print(f"[{params}] {r['source_lines']} lines, peak {r['peak_repair_memory_bytes'] / 1024:.0f} KiB")
+        print("   ", stages)
+    print("Wrote:", out.resolve())
+
+    mismatches = [(r["params"], r["rcg_mismatches"]) for r in report["results"] if r["rcg_mismatches"]]
+    for params, fns in mismatches:
+        print("RCG MISMATCH:", params, ", ".join(fns))
+    if mismatches:
+        return 1
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report, args.threshold)
+        for line in regressions:
+            print("REGRESSION:", line)
+        if regressions:
+            return 1
+        print("OK: no stage slower than", args.threshold, "x baseline.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.server import serve  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Serve SafePrompt repairs from warm worker processes (NDJSON over a socket).")
+    p.add_argument("--socket", default=None, help="Unix socket path (default: TCP on --host/--port)")
+    p.add_argument("--host", default="127.0.0.1", help="TCP host (localhost only by default)")
+    p.add_argument("--port", type=int, default=8765, help="TCP port")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--queue-size", type=int, default=256, help="Pending jobs accepted before clients are throttled")
+    p.add_argument("--batch-size", type=int, default=16, help="Maximum small jobs sent to a worker at once")
+    p.add_argument("--batch-window-ms", type=float, default=2.0, help="How long to wait for a batch to fill")
+    p.add_argument("--max-request-mb", type=float, default=64.0,
+                   help="Longest request line accepted (inline sources included); longer ones get an error response")
+    args = p.parse_args()
+
+    serve(args.socket, args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+          batch_size=args.batch_size, batch_window=args.batch_window_ms / 1000.0,
+          max_request_bytes=int(args.max_request_mb * 1024 * 1024))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Stand-in for `solc --standard-json` when no compiler is installed.
+
+Reports a ParserError for unbalanced brackets or a missing pragma, which is enough
+to exercise the compile-check backend end to end:
+
+    python scripts/run_demo_repair.py --compiler solc --solc "python scripts/solc_stub.py"
+"""
+from __future__ import annotations
+import json
+import re
+import sys
+
+VERSION = "0.8.19+stub"
+
+# strings and comments, so brackets inside them are not counted
+_SKIP_RE = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)')
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+_CLOSING = {v: k for k, v in _PAIRS.items()}
+
+def check_source(name: str, src: str):
+    errors = []
+    if "pragma solidity" not in src:
+        errors.append((0, "Source file does not specify required compiler version!", "warning"))
+    stack = []
+    text = _SKIP_RE.sub(lambda m: " " * len(m.group(0)), src)
+    for i, ch in enumerate(text):
+        if ch in "([{":
+            stack.append((ch, i))
+        elif ch in _PAIRS:
+            if not stack or stack[-1][0] != _PAIRS[ch]:
+                errors.append((i, f"Expected primary expression, got '{ch}'.", "error"))
+                break
+            stack.pop()
+    else:
+        if stack:
+            errors.append((stack[-1][1], f"Expected '{_CLOSING[stack[-1][0]]}' but got end of source.", "error"))
+    return [{
+        "component": "general",
+        "severity": severity,
+        "type": "ParserError" if severity == "error" else "Warning",
+        "message": message,
+        "formattedMessage": f"{'ParserError' if severity == 'error' else 'Warning'}: {message}\n --> {name}:{pos}\n",
+        "sourceLocation": {"file": name, "start": pos, "end": pos + 1},
+    } for pos, message, severity in errors]
+
+def main():
+    if "--version" in sys.argv:
+        print("solc, the solidity compiler commandline interface")
+        print(f"Version: {VERSION}")
+        return
+    if "--standard-json" not in sys.argv:
+        print("only --version and --standard-json are supported by this stub", file=sys.stderr)
+        sys.exit(1)
+    request = json.load(sys.stdin)
+    errors = []
+    for name, source in request.get("sources", {}).items():
+        errors += check_source(name, source.get("content", ""))
+    out = {"sources": {name: {"id": i} for i, name in enumerate(request.get("sources", {}))}, "contracts": {}}
+    if errors:
+        out["errors"] = errors
+    json.dump(out, sys.stdout)
+
+if __name__ == "__main__":
+    main()
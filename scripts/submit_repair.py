@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from safeprompt.server import submit  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Send repair jobs to a running SafePrompt repair server.")
+    p.add_argument("pairs", nargs="+", help="CONTRACT:WITNESS pairs")
+    p.add_argument("--socket", default=None, help="Unix socket path (default: TCP on --host/--port)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--out", default=None, help="Write each job's outputs under this directory")
+    args = p.parse_args()
+
+    jobs = []
+    for i, pair in enumerate(args.pairs):
+        contract, _, witness = pair.partition(":")
+        job = {"id": i, "contract": str(Path(contract).resolve()), "witness": str(Path(witness).resolve())}
+        if args.out:
+            job["out"] = str((Path(args.out) / Path(contract).stem).resolve())
+        jobs.append(job)
+
+    failed = 0
+    for resp in submit(jobs, args.socket, args.host, args.port):
+        print(json.dumps(resp))
+        failed += not resp["ok"]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())